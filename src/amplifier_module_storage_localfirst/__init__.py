@@ -38,6 +38,14 @@ Example usage:
     todo_id = await storage.save("todos", {"text": "Buy groceries", "status": "pending"})
 """
 
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import functools
+import importlib
+from typing import TYPE_CHECKING
+
 from amplifier_module_storage_localfirst.errors import (
     ConflictError,
     NotFoundError,
@@ -46,26 +54,31 @@ from amplifier_module_storage_localfirst.errors import (
     StorageError,
     SyncError,
 )
-from amplifier_module_storage_localfirst.protocol import LocalFirstStorage
-from amplifier_module_storage_localfirst.sqlite import SQLiteLocalFirstStorage
 from amplifier_module_storage_localfirst.types import (
     Change,
     Conflict,
+    Entity,
     FieldType,
     Schema,
     StorageConfig,
     SyncResult,
 )
 
-__all__ = [
+if TYPE_CHECKING:
+    from amplifier_module_storage_localfirst.protocol import CollectionHandle, LocalFirstStorage
+    from amplifier_module_storage_localfirst.sqlite import SQLiteLocalFirstStorage
+
+__all__ = (
     # Main classes
     "LocalFirstStorage",
+    "CollectionHandle",
     "SQLiteLocalFirstStorage",
     # Configuration
     "StorageConfig",
     "Schema",
     "FieldType",
     # Data types
+    "Entity",
     "SyncResult",
     "Conflict",
     "Change",
@@ -78,13 +91,43 @@ __all__ = [
     "NotSupportedError",
     # Mount
     "mount",
-]
+)
 
 
 # Amplifier module type identifier
 __amplifier_module_type__ = "storage"
 
 
+# Names resolved on first access, mapped to the submodule defining them
+_LAZY_ATTRS = {
+    "CollectionHandle": "protocol",
+    "LocalFirstStorage": "protocol",
+    "SQLiteLocalFirstStorage": "sqlite",
+}
+
+
+def __getattr__(name: str):
+    """Lazily import the protocol and SQLite backend on first access."""
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    module = importlib.import_module(f"{__name__}.{module_name}")
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+# Keys of the mount config that map onto StorageConfig
+_STORAGE_CONFIG_FIELDS = frozenset(f.name for f in dataclasses.fields(StorageConfig))
+
+
+@functools.cache
+def _to_field_type(value: str) -> FieldType:
+    """Convert a field type string to FieldType (memoized; few distinct values)."""
+    return FieldType(value)
+
+
 async def mount(coordinator, config: dict):
     """Amplifier module entry point.
 
@@ -92,45 +135,49 @@ async def mount(coordinator, config: dict):
 
     Args:
         coordinator: Amplifier coordinator instance.
-        config: Configuration dict with keys:
-            - db_path: Path to SQLite database
+        config: Configuration dict. Any StorageConfig field is accepted,
+            e.g.:
+            - db_path: Path to SQLite database (default: "data.db")
             - backend_url: Optional sync endpoint
             - enable_vectors: Enable semantic search (default: False)
             - auto_sync: Auto-sync on changes (default: True)
             - sync_interval: Seconds between background syncs (default: 60)
+            - journal_mode, synchronous, cache_size_kb, mmap_size_bytes,
+              temp_store: SQLite tuning (see StorageConfig)
             - schemas: List of schema definitions
     """
-    storage_config = StorageConfig(
-        db_path=config.get("db_path", "data.db"),
-        backend_url=config.get("backend_url"),
-        auth_token=config.get("auth_token"),
-        enable_vectors=config.get("enable_vectors", False),
-        auto_sync=config.get("auto_sync", True),
-        sync_interval=config.get("sync_interval", 60),
-        conflict_strategy=config.get("conflict_strategy", "last_write_wins"),
-    )
+    # Defaults live on the StorageConfig dataclass; db_path is required there
+    options = {k: v for k, v in config.items() if k in _STORAGE_CONFIG_FIELDS}
+    options.setdefault("db_path", "data.db")
+    storage_config = StorageConfig(**options)
+
+    from amplifier_module_storage_localfirst.sqlite import SQLiteLocalFirstStorage
 
     storage = SQLiteLocalFirstStorage()
     await storage.initialize(storage_config)
 
-    # Register schemas from config
-    for schema_def in config.get("schemas", []):
-        # Convert field type strings to FieldType enum
-        fields = {}
-        for field_name, field_type in schema_def.get("fields", {}).items():
-            if isinstance(field_type, str):
-                fields[field_name] = FieldType(field_type)
-            else:
-                fields[field_name] = field_type
-
-        schema = Schema(
+    # Build schemas from config
+    schemas = [
+        Schema(
             name=schema_def["name"],
-            fields=fields,
+            # Convert field type strings to FieldType enum
+            fields={
+                field_name: _to_field_type(field_type) if type(field_type) is str else field_type
+                for field_name, field_type in schema_def.get("fields", {}).items()
+            },
             primary_key=schema_def.get("primary_key", "id"),
-            indexes=schema_def.get("indexes"),
+            # Composite indexes arrive as lists from YAML/JSON config
+            indexes=[
+                index if isinstance(index, str) else tuple(index)
+                for index in schema_def.get("indexes") or []
+            ],
             vector_field=schema_def.get("vector_field"),
         )
-        await storage.register_collection(schema)
+        for schema_def in config.get("schemas", [])
+    ]
+
+    # Collections are independent, so register them concurrently
+    await asyncio.gather(*(storage.register_collection(schema) for schema in schemas))
 
     # Mount at named slot
     await coordinator.mount("storage", storage)
@@ -0,0 +1,165 @@
+"""Async connections over apsw, used when StorageConfig.driver is "apsw".
+
+apsw is an optional driver (``pip install ...[apsw]``). `ApswConnection`
+exposes the subset of the aiosqlite API the storage uses. As with
+aiosqlite, every call runs on the connection's own thread, one at a time,
+but as a plain executor job rather than through aiosqlite's request queue,
+and statements are prepared once through apsw's statement cache.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import itertools
+import weakref
+from collections.abc import AsyncIterator, Callable, Iterable, Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, TypeVar
+
+import apsw
+
+_T = TypeVar("_T")
+
+
+class ApswCursor:
+    """Rows of one executed statement, fetched on the connection's thread."""
+
+    __slots__ = (
+        "__weakref__", "_conn", "_cursor", "_rows", "arraysize", "lastrowid", "rowcount"
+    )
+
+    def __init__(
+        self,
+        conn: ApswConnection,
+        cursor: apsw.Cursor | None,
+        rowcount: int,
+        lastrowid: int | None = None,
+    ):
+        self._conn = conn
+        self._cursor = cursor
+        self._rows: Iterator[tuple] = iter(()) if cursor is None else cursor
+        self.arraysize = 1
+        # Rows changed by the statement and the rowid of the last row
+        # inserted (only meaningful for writes)
+        self.rowcount = rowcount
+        self.lastrowid = lastrowid
+
+    def _reset(self) -> None:
+        """Finish the statement (on the connection's thread)."""
+        if self._cursor is not None:
+            self._cursor.close()
+            self._cursor = None
+        self._rows = iter(())
+
+    async def fetchone(self) -> tuple | None:
+        return await self._conn._run(next, self._rows, None)
+
+    async def fetchmany(self, size: int | None = None) -> list[tuple]:
+        return await self._conn._run(
+            lambda: list(itertools.islice(self._rows, size or self.arraysize))
+        )
+
+    async def fetchall(self) -> list[tuple]:
+        return await self._conn._run(list, self._rows)
+
+    async def close(self) -> None:
+        await self._conn._run(self._reset)
+
+    async def __aiter__(self) -> AsyncIterator[tuple]:
+        while rows := await self.fetchmany():
+            for row in rows:
+                yield row
+
+
+class ApswConnection:
+    """An apsw connection driven from asyncio."""
+
+    __slots__ = ("_conn", "_cursors", "_executor")
+
+    def __init__(self, conn: apsw.Connection, executor: ThreadPoolExecutor):
+        self._conn = conn
+        self._executor = executor
+        # Cursors whose statements may still be running; like sqlite3, a
+        # commit or rollback finishes them first (SQLite refuses otherwise)
+        self._cursors: weakref.WeakSet[ApswCursor] = weakref.WeakSet()
+
+    async def _run(self, fn: Callable[..., _T], *args: Any) -> _T:
+        """Run a call on the connection's thread."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args))
+
+    async def execute(self, sql: str, parameters: Sequence[Any] = ()) -> ApswCursor:
+        def run() -> ApswCursor:
+            cursor = self._conn.cursor()
+            cursor.execute(sql, parameters)
+            result = ApswCursor(
+                self, cursor, self._conn.changes(), self._conn.last_insert_rowid()
+            )
+            self._cursors.add(result)
+            return result
+
+        return await self._run(run)
+
+    async def executemany(
+        self,
+        sql: str,
+        parameters: Iterable[Sequence[Any]],
+    ) -> ApswCursor:
+        def run() -> ApswCursor:
+            # Executed one by one (each reuses the cached statement) so that
+            # rowcount sums the rows changed by every execution, excluding
+            # rows changed by triggers
+            cursor = self._conn.cursor()
+            changed = 0
+            for params in parameters:
+                cursor.execute(sql, params)
+                changed += self._conn.changes()
+            return ApswCursor(self, None, changed)
+
+        return await self._run(run)
+
+    async def executescript(self, script: str) -> None:
+        def run() -> None:
+            for _ in self._conn.cursor().execute(script):
+                pass
+
+        await self._run(run)
+
+    async def commit(self) -> None:
+        await self._run(self._end_transaction, "COMMIT")
+
+    async def rollback(self) -> None:
+        await self._run(self._end_transaction, "ROLLBACK")
+
+    def _end_transaction(self, statement: str) -> None:
+        for cursor in list(self._cursors):
+            cursor._reset()
+        self._cursors.clear()
+        if not self._conn.getautocommit():
+            self._conn.cursor().execute(statement)
+
+    async def enable_load_extension(self, value: bool) -> None:
+        await self._run(self._conn.enableloadextension, value)
+
+    async def load_extension(self, path: str) -> None:
+        await self._run(self._conn.loadextension, path)
+
+    async def close(self) -> None:
+        await self._run(self._conn.close)
+        self._executor.shutdown(wait=False)
+
+
+async def connect(db_path: str | Path, uri: bool = False) -> ApswConnection:
+    """Open an apsw connection with its own worker thread.
+
+    With `uri`, `db_path` is an SQLite URI filename ("file:...").
+    """
+    flags = apsw.SQLITE_OPEN_READWRITE | apsw.SQLITE_OPEN_CREATE
+    if uri:
+        flags |= apsw.SQLITE_OPEN_URI
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="apsw")
+    loop = asyncio.get_running_loop()
+    conn = await loop.run_in_executor(executor, apsw.Connection, str(db_path), flags)
+    return ApswConnection(conn, executor)
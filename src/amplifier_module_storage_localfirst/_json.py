@@ -0,0 +1,42 @@
+"""JSON encoding for stored values, using orjson when it is installed.
+
+orjson is an optional speedup (``pip install ...[speedups]``). Both code
+paths produce compact JSON text and encode datetimes/dates as ISO 8601, so
+data written by one can be read by the other.
+"""
+
+from __future__ import annotations
+
+import json
+from datetime import date
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on installed extras
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    """Encode values stdlib json does not handle natively."""
+    if isinstance(value, date):  # Includes datetime
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def dumps(value: Any) -> str:
+        """Serialize a value to JSON text."""
+        return orjson.dumps(value, option=_ORJSON_OPTIONS).decode()
+
+    loads = orjson.loads
+
+else:
+
+    def dumps(value: Any) -> str:
+        """Serialize a value to JSON text."""
+        return json.dumps(value, separators=(",", ":"), default=_default)
+
+    loads = json.loads
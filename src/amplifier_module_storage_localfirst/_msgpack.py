@@ -0,0 +1,53 @@
+"""MessagePack encoding for JSON fields (``json_encoding="msgpack"``).
+
+msgpack is an optional speedup (``pip install ...[speedups]``). A database
+created with ``json_encoding="msgpack"`` stores JSON field values as
+compact MessagePack BLOBs and needs msgpack to be opened. Datetimes/dates
+are encoded as ISO 8601 strings, as in JSON.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from typing import Any
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - depends on installed extras
+    msgpack = None
+
+from amplifier_module_storage_localfirst.errors import StorageError
+
+available = msgpack is not None
+
+
+def _default(value: Any) -> Any:
+    """Encode values msgpack does not handle natively."""
+    if isinstance(value, date):  # Includes datetime
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not MessagePack serializable")
+
+
+if msgpack is not None:
+
+    def packb(value: Any) -> bytes:
+        """Serialize a value to MessagePack bytes."""
+        return msgpack.packb(value, use_bin_type=True, default=_default)
+
+    def unpackb(data: bytes) -> Any:
+        """Deserialize MessagePack bytes."""
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+else:
+
+    def packb(value: Any) -> bytes:
+        """Serialize a value to MessagePack bytes (needs msgpack)."""
+        raise StorageError(
+            "Storing MessagePack values needs msgpack. Install the 'speedups' extra."
+        )
+
+    def unpackb(data: bytes) -> Any:
+        """Deserialize MessagePack bytes (needs msgpack)."""
+        raise StorageError(
+            "Reading MessagePack values needs msgpack. Install the 'speedups' extra."
+        )
@@ -2,18 +2,22 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Protocol, runtime_checkable
+from typing import TYPE_CHECKING, Protocol
 
 if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Iterable, Sequence
+    from contextlib import AbstractAsyncContextManager
+    from datetime import datetime
+
     from amplifier_module_storage_localfirst.types import (
         Change,
+        Entity,
         Schema,
         StorageConfig,
         SyncResult,
     )
 
 
-@runtime_checkable
 class LocalFirstStorage(Protocol):
     """Generic local-first storage with optional sync.
 
@@ -22,6 +26,8 @@ class LocalFirstStorage(Protocol):
     all the mechanics of persistence, querying, and sync.
 
     Implementations must provide all methods marked with `...`.
+    This is a static (structural) type; it is not meant for
+    `isinstance()` checks.
     """
 
     # === Lifecycle ===
@@ -58,12 +64,51 @@ class LocalFirstStorage(Protocol):
         """
         ...
 
+    # === Transactions ===
+
+    def transaction(self) -> AbstractAsyncContextManager[None]:
+        """Group multiple writes into a single transaction.
+
+        Usage:
+            async with storage.transaction():
+                for entity in entities:
+                    await storage.save("todos", entity)
+
+        Writes inside the block are committed together on exit and rolled
+        back if the block raises. Transactions may be nested.
+        """
+        ...
+
+    # === Collection Handles ===
+
+    def collection(self, name: str) -> CollectionHandle:
+        """Get a handle bound to a registered collection.
+
+        Resolves the collection once, so loops can avoid the per-call
+        lookup:
+
+            todos = storage.collection("todos")
+            for entity in entities:
+                await todos.save(entity)
+
+        Args:
+            name: Name of the collection.
+
+        Returns:
+            Handle whose methods mirror the CRUD/query methods without the
+            collection argument.
+
+        Raises:
+            SchemaError: If collection not registered.
+        """
+        ...
+
     # === CRUD Operations ===
 
     async def save(
         self,
         collection: str,
-        entity: dict,
+        entity: Entity,
     ) -> str:
         """Save an entity.
 
@@ -85,7 +130,7 @@ class LocalFirstStorage(Protocol):
         self,
         collection: str,
         entity_id: str,
-    ) -> dict | None:
+    ) -> Entity | None:
         """Get an entity by ID.
 
         Args:
@@ -100,12 +145,31 @@ class LocalFirstStorage(Protocol):
         """
         ...
 
+    async def get_many(
+        self,
+        collection: str,
+        entity_ids: Sequence[str],
+    ) -> dict[str, Entity | None]:
+        """Get multiple entities by ID in one round-trip.
+
+        Args:
+            collection: Name of the collection.
+            entity_ids: IDs of the entities.
+
+        Returns:
+            Dict mapping each requested ID to its entity, or None if not found.
+
+        Raises:
+            SchemaError: If collection not registered.
+        """
+        ...
+
     async def update(
         self,
         collection: str,
         entity_id: str,
-        changes: dict,
-    ) -> dict:
+        changes: Entity,
+    ) -> Entity:
         """Partial update of an entity.
 
         Only updates fields present in changes dict.
@@ -124,6 +188,23 @@ class LocalFirstStorage(Protocol):
         """
         ...
 
+    async def update_many(
+        self,
+        collection: str,
+        updates: dict[str, Entity],
+    ) -> None:
+        """Partial update of multiple entities in a single transaction.
+
+        Args:
+            collection: Name of the collection.
+            updates: Dict mapping entity IDs to their field changes.
+
+        Raises:
+            NotFoundError: If any entity doesn't exist (nothing is updated).
+            SchemaError: If collection not registered.
+        """
+        ...
+
     async def delete(
         self,
         collection: str,
@@ -143,6 +224,114 @@ class LocalFirstStorage(Protocol):
         """
         ...
 
+    async def save_many(
+        self,
+        collection: str,
+        entities: list[Entity],
+    ) -> list[str]:
+        """Save multiple entities in a single transaction.
+
+        Each entity follows the same create-or-update rules as `save`,
+        but the whole batch is committed once. For large ingests
+        (thousands of rows) prefer `save_rows`, which skips building a
+        dict per entity.
+
+        Args:
+            collection: Name of the collection.
+            entities: Entity dicts to save.
+
+        Returns:
+            The entity IDs, in the same order as `entities`.
+
+        Raises:
+            SchemaError: If collection not registered.
+        """
+        ...
+
+    async def save_rows(
+        self,
+        collection: str,
+        columns: Sequence[str],
+        rows: Iterable[Sequence],
+    ) -> int:
+        """Save rows of positional values in a single transaction.
+
+        Column names are given once and each row is a sequence of values
+        in the same order. Rows may be a generator; they are streamed to
+        the database rather than materialized. Existing entities are
+        updated like `save`. If the primary key is not among `columns`,
+        an ID is generated for every row.
+
+        Args:
+            collection: Name of the collection.
+            columns: Field names, in row order.
+            rows: Iterable of value sequences.
+
+        Returns:
+            Number of rows saved.
+
+        Raises:
+            SchemaError: If collection not registered or a column is unknown.
+        """
+        ...
+
+    async def delete_many(
+        self,
+        collection: str,
+        entity_ids: list[str],
+    ) -> int:
+        """Delete multiple entities in a single transaction.
+
+        Args:
+            collection: Name of the collection.
+            entity_ids: IDs of the entities to delete.
+
+        Returns:
+            Number of entities deleted (missing IDs are skipped).
+
+        Raises:
+            SchemaError: If collection not registered.
+        """
+        ...
+
+    async def purge_deleted(
+        self,
+        collection: str,
+        before: datetime | None = None,
+    ) -> int:
+        """Permanently remove soft-deleted entities.
+
+        Deleted entities are kept as tombstones until purged. Tombstones
+        whose deletion has not been synced yet are never removed.
+
+        Args:
+            collection: Name of the collection.
+            before: Only purge entities deleted before this time
+                (None = all eligible).
+
+        Returns:
+            Number of entities removed.
+
+        Raises:
+            SchemaError: If collection not registered.
+        """
+        ...
+
+    async def truncate(self, collection: str) -> None:
+        """Remove every entity from a collection.
+
+        The collection stays registered. Entities are deleted outright
+        (no tombstones) and nothing is queued for sync, so this is meant
+        for resetting local data, e.g. between tests.
+
+        Args:
+            collection: Name of the collection.
+
+        Raises:
+            SchemaError: If collection not registered.
+        """
+        ...
+
     # === Query Operations ===
 
     async def query(
@@ -152,7 +341,7 @@ class LocalFirstStorage(Protocol):
         sort: list[tuple[str, str]] | None = None,
         limit: int = 100,
         offset: int = 0,
-    ) -> list[dict]:
+    ) -> list[Entity]:
         """Query entities with filtering, sorting, pagination.
 
         Filter syntax:
@@ -173,7 +362,38 @@ class LocalFirstStorage(Protocol):
             List of matching entities.
 
         Raises:
-            SchemaError: If collection not registered.
+            SchemaError: If collection not registered or a filter/sort
+                field is not in the schema.
+        """
+        ...
+
+    def query_iter(
+        self,
+        collection: str,
+        filter: dict | None = None,
+        sort: list[tuple[str, str]] | None = None,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> AsyncIterator[Entity]:
+        """Stream entities matching a query.
+
+        Same filter and sort syntax as `query`, but entities are yielded
+        as rows are fetched instead of being collected into a list, so
+        large scans run in constant memory. Use with `async for`.
+
+        Args:
+            collection: Name of the collection.
+            filter: Filter conditions (AND combined).
+            sort: List of (field, direction) tuples. Direction: "asc" or "desc".
+            limit: Maximum entities to yield (None = no limit).
+            offset: Number of entities to skip.
+
+        Yields:
+            Matching entities.
+
+        Raises:
+            SchemaError: If collection not registered or a filter/sort
+                field is not in the schema.
         """
         ...
 
@@ -181,18 +401,24 @@ class LocalFirstStorage(Protocol):
         self,
         collection: str,
         filter: dict | None = None,
+        exact: bool = False,
     ) -> int:
         """Count entities matching filter.
 
+        Without a filter, implementations may answer from a maintained
+        per-collection counter instead of scanning the table.
+
         Args:
             collection: Name of the collection.
             filter: Filter conditions (same syntax as query).
+            exact: Always count matching rows, even without a filter.
 
         Returns:
             Count of matching entities.
 
         Raises:
-            SchemaError: If collection not registered.
+            SchemaError: If collection not registered or a filter field
+                is not in the schema.
         """
         ...
 
@@ -209,7 +435,7 @@ class LocalFirstStorage(Protocol):
         query: str,
         limit: int = 10,
         filter: dict | None = None,
-    ) -> list[dict]:
+    ) -> list[Entity]:
         """Find semantically similar entities.
 
         Requires enable_vectors=True in config and vector_field in schema.
@@ -250,8 +476,17 @@ class LocalFirstStorage(Protocol):
         """
         ...
 
-    async def get_pending_changes(self) -> list[Change]:
-        """Get changes not yet synced.
+    async def get_pending_changes(
+        self,
+        after: Change | None = None,
+        limit: int | None = None,
+    ) -> list[Change]:
+        """Get changes not yet synced, oldest first.
+
+        Args:
+            after: Last change of the previous page; only later changes
+                are returned.
+            limit: Maximum number of changes to return (None = all).
 
         Returns:
             List of pending changes.
@@ -261,6 +496,55 @@ class LocalFirstStorage(Protocol):
         """
         ...
 
+    def iter_pending_changes(
+        self,
+        after: Change | None = None,
+        chunk_size: int = 1000,
+    ) -> AsyncIterator[Change]:
+        """Stream changes not yet synced, oldest first.
+
+        Like `get_pending_changes`, but fetches a page at a time while the
+        caller iterates, so a long queue is never held in memory at once.
+        Use with `async for`.
+
+        Args:
+            after: Only changes after this one are yielded.
+            chunk_size: Changes fetched per round-trip.
+
+        Yields:
+            Pending changes.
+
+        Raises:
+            NotSupportedError: If backend_url not configured.
+        """
+        ...
+
+    async def ack_changes(self, change_ids: Iterable[int]) -> None:
+        """Remove changes the backend has accepted from the pending queue.
+
+        Args:
+            change_ids: `Change.id` of each synced change.
+
+        Raises:
+            NotSupportedError: If backend_url not configured.
+        """
+        ...
+
+    async def apply_changes(self, changes: Sequence[Change]) -> None:
+        """Apply changes received from the backend to local storage.
+
+        Changes are applied in order within a single transaction and are
+        not recorded as pending (they came from the backend). Consecutive
+        changes of the same kind are written in one batch.
+
+        Args:
+            changes: Changes to apply ("create", "update" or "delete").
+
+        Raises:
+            SchemaError: If a change targets an unregistered collection.
+        """
+        ...
+
     async def force_push(self, collection: str, entity_id: str) -> None:
         """Force push a specific entity.
 
@@ -290,3 +574,43 @@ class LocalFirstStorage(Protocol):
             SyncError: If remote entity not found.
         """
         ...
+
+
+class CollectionHandle(Protocol):
+    """A collection of a LocalFirstStorage, resolved ahead of time.
+
+    Methods behave like the storage methods of the same name, with the
+    collection argument already bound.
+    """
+
+    name: str
+
+    async def save(self, entity: Entity) -> str:
+        """Save an entity (create or update)."""
+        ...
+
+    async def get(self, entity_id: str) -> Entity | None:
+        """Get an entity by ID."""
+        ...
+
+    async def update(self, entity_id: str, changes: Entity) -> Entity:
+        """Partial update of an entity."""
+        ...
+
+    async def delete(self, entity_id: str) -> bool:
+        """Delete an entity."""
+        ...
+
+    async def query(
+        self,
+        filter: dict | None = None,
+        sort: list[tuple[str, str]] | None = None,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> list[Entity]:
+        """Query entities with filtering, sorting, pagination."""
+        ...
+
+    async def count(self, filter: dict | None = None, exact: bool = False) -> int:
+        """Count entities matching filter."""
+        ...
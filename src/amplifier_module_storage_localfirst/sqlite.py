@@ -2,18 +2,29 @@
 
 from __future__ import annotations
 
-import json
-import uuid
-from datetime import datetime, timezone
+import asyncio
+import functools
+import itertools
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Callable, Iterable, Iterator, Sequence
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Union
 
 import aiosqlite
 
+from amplifier_module_storage_localfirst import _json, _msgpack
 from amplifier_module_storage_localfirst.errors import (
     NotFoundError,
     NotSupportedError,
     SchemaError,
+    StorageError,
 )
 from amplifier_module_storage_localfirst.types import (
     Change,
@@ -24,7 +35,410 @@ from amplifier_module_storage_localfirst.types import (
 )
 
 if TYPE_CHECKING:
-    pass
+    from amplifier_module_storage_localfirst._apsw import ApswConnection
+
+# A connection from either driver; both expose the calls used here
+_Connection = Union[aiosqlite.Connection, "ApswConnection"]
+
+# SQLite's default SQLITE_MAX_VARIABLE_NUMBER on older builds
+_MAX_IN_PARAMS = 999
+
+# Accepted values for PRAGMAs taken from StorageConfig
+_JOURNAL_MODES = frozenset({"WAL", "DELETE", "MEMORY"})
+_SYNCHRONOUS_LEVELS = frozenset({"OFF", "NORMAL", "FULL"})
+_TEMP_STORES = frozenset({"DEFAULT", "FILE", "MEMORY"})
+_DRIVERS = frozenset({"aiosqlite", "apsw"})
+
+# How long a connection waits for another's lock before failing with
+# "database is locked"
+_BUSY_TIMEOUT_MS = 5000
+
+# Upserts (INSERT ... ON CONFLICT DO UPDATE) need SQLite 3.24; RETURNING
+# arrived in 3.35 and is used only where available
+_MIN_SQLITE_VERSION = (3, 24, 0)
+_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+# Entities serialized and written per step of a batch save
+_BATCH_SIZE = 5000
+
+# Most standalone writes committed together by one group commit
+_MAX_GROUP_WRITES = 256
+
+# Rows pulled from the aiosqlite worker thread per round-trip when streaming
+_FETCH_SIZE = 256
+
+# Nearest neighbours fetched per requested result when a filter may
+# discard some of them
+_FILTERED_KNN_FACTOR = 10
+
+# Embeddings are unit vectors stored as int8: each component in [-1, 1]
+# is scaled by this and rounded
+_INT8_SCALE = 127
+
+# IDs generated per batch of random bytes fetched by _IdPool
+_ID_POOL_SIZE = 64
+
+# Pending-change timestamps are stored as integer microseconds since this
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# SQL for the comparison operators accepted as `field__op` filter keys
+_FILTER_OPS = {
+    "eq": "= ?",
+    "ne": "!= ?",
+    "gt": "> ?",
+    "gte": ">= ?",
+    "lt": "< ?",
+    "lte": "<= ?",
+}
+
+# Conditions for filters that match no row (e.g. `__in` with an empty
+# list) or every row; queries with a _NEVER condition skip the database
+_NEVER = "0"
+_ALWAYS = "1"
+
+# LIKE patterns for the string-matching filter operators
+_LIKE_PATTERNS = {
+    "contains": "%{}%",
+    "starts_with": "{}%",
+    "ends_with": "%{}",
+}
+
+
+def _now() -> tuple[str, int]:
+    """Read the clock once for a write.
+
+    Returns the time as an ISO-8601 UTC string (entity metadata) and as
+    microseconds since the Unix epoch (change log).
+    """
+    micros = time.time_ns() // 1_000
+    return (_EPOCH + timedelta(microseconds=micros)).isoformat(), micros
+
+
+class _IdPool:
+    """Generates UUIDv7 strings from a preallocated buffer of random bytes.
+
+    The leading 48 bits are the Unix time in milliseconds, so new IDs sort
+    after older ones and inserts land at the right edge of the primary key
+    B-tree instead of on random pages. The 10 random bytes of each ID are
+    sliced from one `os.urandom` call per `_ID_POOL_SIZE` IDs.
+    """
+
+    __slots__ = ("_buf", "_off")
+
+    def __init__(self) -> None:
+        self._buf = b""
+        self._off = 0
+
+    def clear(self) -> None:
+        """Drop the buffered bytes (a forked child must not reuse them)."""
+        self._buf = b""
+        self._off = 0
+
+    def __iter__(self) -> _IdPool:
+        return self
+
+    def __next__(self) -> str:
+        if self._off >= len(self._buf):
+            self._buf = os.urandom(10 * _ID_POOL_SIZE)
+            self._off = 0
+        random = int.from_bytes(self._buf[self._off : self._off + 10], "big")
+        self._off += 10
+        value = (time.time_ns() // 1_000_000) << 80 | random
+        value = value & ~(0xF << 76) | 0x7 << 76  # Version 7
+        value = value & ~(0x3 << 62) | 0x2 << 62  # RFC 4122 variant
+        h = f"{value:032x}"
+        return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+_id_pool = _IdPool()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_id_pool.clear)
+
+
+def _new_id() -> str:
+    """Generate a UUIDv7 string."""
+    return next(_id_pool)
+
+
+def _epoch_micros(moment: datetime) -> int:
+    """Microseconds since the Unix epoch; naive datetimes are taken as UTC."""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return (moment - _EPOCH) // timedelta(microseconds=1)
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _serialize_json(value: Any) -> Any:
+    return None if value is None else _json.dumps(value)
+
+
+def _serialize_msgpack(value: Any) -> Any:
+    return None if value is None else _msgpack.packb(value)
+
+
+def _serialize_bool(value: Any) -> Any:
+    return None if value is None else (1 if value else 0)
+
+
+def _serialize_temporal(value: Any) -> Any:
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+# Per-type value serializers; types not listed are stored as-is
+_SERIALIZERS: dict[FieldType, Callable[[Any], Any]] = {
+    FieldType.JSON: _serialize_json,
+    FieldType.BOOLEAN: _serialize_bool,
+    FieldType.DATETIME: _serialize_temporal,
+    FieldType.DATE: _serialize_temporal,
+}
+
+# Serializers for each `json_encoding`, which differ only for JSON fields
+_JSON_ENCODINGS: dict[str, dict[FieldType, Callable[[Any], Any]]] = {
+    "json": _SERIALIZERS,
+    "msgpack": {**_SERIALIZERS, FieldType.JSON: _serialize_msgpack},
+}
+
+# Conversions inlined into generated row readers, `{v}` being the column
+# value; types not listed are returned as stored
+_DECODE_EXPRESSIONS: dict[FieldType, str] = {
+    FieldType.JSON: (
+        "_loads({v}) if isinstance({v}, str) else _unpackb({v}) if isinstance({v}, bytes) else {v}"
+    ),
+    FieldType.BOOLEAN: "None if {v} is None else bool({v})",
+    FieldType.INTEGER: "None if {v} is None else int({v})",
+    FieldType.FLOAT: "None if {v} is None else float({v})",
+}
+
+# Metadata columns included in every entity read back
+_METADATA_FIELDS = ("_created_at", "_updated_at", "_version")
+
+
+def _build_upsert_sql(schema: Schema, columns: tuple[str, ...]) -> str:
+    """Build the INSERT ... ON CONFLICT statement for the given columns.
+
+    Parameters are the column values followed by `_created_at` and
+    `_updated_at`. Existing rows (including soft-deleted ones) are
+    updated in place and their version is bumped.
+    """
+    pk = schema.primary_key
+    insert_columns = [*columns, "_created_at", "_updated_at"]
+    placeholders = ", ".join("?" * len(insert_columns))
+    updates = [f"{name} = excluded.{name}" for name in columns if name != pk]
+    updates.extend([
+        "_updated_at = excluded._updated_at",
+        "_deleted = 0",
+        f"_version = {schema.name}._version + 1",
+    ])
+    return (
+        f"INSERT INTO {schema.name} ({', '.join(insert_columns)}) "
+        f"VALUES ({placeholders}) "
+        f"ON CONFLICT({pk}) DO UPDATE SET {', '.join(updates)}"
+    )
+
+
+def _compile_row_reader(
+    field_types: Iterable[tuple[str, FieldType]],
+    table_columns: Sequence[str],
+) -> Callable[[Sequence[Any]], dict]:
+    """Generate a function that turns a `SELECT *` row into an entity dict.
+
+    Column positions are baked in as constants and each field's conversion
+    is inlined, so reading a row is one dict display with no per-field
+    dispatch. Fields the table has no column for are left out.
+    """
+    index = {name: i for i, name in enumerate(table_columns)}
+    items = []
+    for name, field_type in field_types:
+        if name not in index:
+            continue
+        column = f"row[{index[name]}]"
+        template = _DECODE_EXPRESSIONS.get(field_type)
+        value = column if template is None else f"({template.format(v=column)})"
+        items.append(f"{name!r}: {value}")
+    items.extend(f"{name!r}: row[{index[name]}]" for name in _METADATA_FIELDS)
+
+    source = f"def row_to_entity(row):\n    return {{{', '.join(items)}}}\n"
+    namespace: dict[str, Any] = {"_loads": _json.loads, "_unpackb": _msgpack.unpackb}
+    exec(source, namespace)  # noqa: S102 - source is built from schema field names
+    return namespace["row_to_entity"]
+
+
+def _compile_filters(
+    fields: Iterable[str],
+) -> dict[str, Callable[[Any], tuple[str, list[Any]]]]:
+    """Map every accepted filter key to a function building its condition.
+
+    Keys are `field` (equality) and `field__op` for each operator. Field
+    names are interpolated into the SQL here, so only known names ever
+    reach a query.
+    """
+    filters: dict[str, Callable[[Any], tuple[str, list[Any]]]] = {}
+    fields = tuple(fields)
+    for field in fields:
+        for op, comparison in _FILTER_OPS.items():
+            filters[f"{field}__{op}"] = functools.partial(_compare, f"{field} {comparison}")
+        for op, pattern in _LIKE_PATTERNS.items():
+            filters[f"{field}__{op}"] = functools.partial(_like, f"{field} LIKE ?", pattern)
+        filters[f"{field}__in"] = functools.partial(_membership, f"{field} IN", _NEVER)
+        filters[f"{field}__not_in"] = functools.partial(
+            _membership, f"{field} NOT IN", _ALWAYS
+        )
+        filters[f"{field}__is_null"] = functools.partial(
+            _is_null, f"{field} IS NULL", f"{field} IS NOT NULL"
+        )
+    # A field name itself may contain "__": an exact name always means
+    # equality on that field
+    for field in fields:
+        filters[field] = functools.partial(_compare, f"{field} = ?")
+    return filters
+
+
+def _compare(sql: str, value: Any) -> tuple[str, list[Any]]:
+    return sql, [value]
+
+
+def _like(sql: str, pattern: str, value: Any) -> tuple[str, list[Any]]:
+    return sql, [pattern.format(value)]
+
+
+def _membership(sql: str, empty_sql: str, value: Any) -> tuple[str, list[Any]]:
+    values = list(value)
+    if not values:
+        return empty_sql, []
+    return f"{sql} ({', '.join('?' * len(values))})", values
+
+
+def _is_null(null_sql: str, not_null_sql: str, value: Any) -> tuple[str, list[Any]]:
+    return (null_sql if value else not_null_sql), []
+
+
+def _where_sql(conditions: tuple[str, ...]) -> str:
+    """Join filter conditions into a WHERE clause excluding deleted rows.
+
+    The filter's own conditions come first: on rows not found through a
+    partial index SQLite tests terms in order, and these are usually more
+    selective than `_deleted = 0`.
+    """
+    return " AND ".join((*conditions, "_deleted = 0"))
+
+
+@functools.lru_cache(maxsize=256)
+def _select_sql(
+    table: str,
+    conditions: tuple[str, ...],
+    order: tuple[tuple[str, str], ...],
+) -> str:
+    """SQL selecting a page of a table's live rows (LIMIT and OFFSET bound last).
+
+    Queries of the same shape differ only in their parameters, so each
+    statement is built once.
+    """
+    order_clause = ""
+    if order:
+        order_clause = f"ORDER BY {', '.join(f'{field} {dir_sql}' for field, dir_sql in order)} "
+    return f"SELECT * FROM {table} WHERE {_where_sql(conditions)} {order_clause}LIMIT ? OFFSET ?"
+
+
+@functools.lru_cache(maxsize=256)
+def _count_sql(table: str, conditions: tuple[str, ...]) -> str:
+    """SQL counting a table's live rows (built once per shape, like `_select_sql`)."""
+    return f"SELECT COUNT(*) FROM {table} WHERE {_where_sql(conditions)}"
+
+
+def _compile_row_packer(
+    field_types: dict[str, FieldType],
+    columns: Sequence[str],
+    serializers: dict[FieldType, Callable[[Any], Any]],
+) -> Callable[..., tuple]:
+    """Generate a function that turns an entity dict into statement parameters.
+
+    The generated `pack(entity, *tail)` returns the serialized values of
+    `columns`, in order, followed by `tail`. Values stored as-is are read
+    inline; only typed values go through their serializer.
+    """
+    namespace: dict[str, Any] = {}
+    items = []
+    for name in columns:
+        serialize = serializers.get(field_types[name])
+        if serialize is None:
+            items.append(f"e[{name!r}]")
+        else:
+            namespace[f"_s{len(namespace)}"] = serialize
+            items.append(f"_s{len(namespace) - 1}(e[{name!r}])")
+    items.append("*tail")
+
+    source = f"def pack(e, *tail):\n    return ({', '.join(items)})\n"
+    exec(source, namespace)  # noqa: S102 - source is built from schema field names
+    return namespace["pack"]
+
+
+@dataclass
+class _SchemaPlan:
+    """SQL and value converters prepared once per registered collection."""
+
+    schema: Schema
+    upsert_sql: str
+    select_by_pk_sql: str
+    delete_by_pk_sql: str
+    field_types: tuple[tuple[str, FieldType], ...]
+    # Generated by _compile_row_reader
+    row_to_entity: Callable[[Sequence[Any]], dict]
+    # Per-type value serializers for the database's JSON encoding
+    serializers: dict[FieldType, Callable[[Any], Any]]
+    # Upsert SQL for every column subset seen so far, keyed by column names
+    upsert_statements: dict[tuple[str, ...], str]
+    # Generated by _compile_row_packer for every column subset seen so far
+    row_packers: dict[tuple[str, ...], Callable[..., tuple]]
+    # Partial-update SQL for every set of changed fields seen so far
+    update_statements: dict[tuple[str, ...], str]
+    # Names accepted in filters and sorts (fields plus readable metadata)
+    filter_fields: frozenset[str]
+    # Condition builders for every accepted filter key (_compile_filters)
+    filters: dict[str, Callable[[Any], tuple[str, list[Any]]]]
+    # Positions of the primary key and _version in a `SELECT *` (or
+    # `RETURNING *`) row
+    pk_index: int
+    version_index: int
+    # INTEGER primary key: an alias of the rowid, assigned by SQLite when
+    # an entity is saved without one
+    integer_pk: bool
+
+    @classmethod
+    def build(
+        cls,
+        schema: Schema,
+        table_columns: Sequence[str],
+        serializers: dict[FieldType, Callable[[Any], Any]],
+    ) -> _SchemaPlan:
+        """Prepare the plan for a schema whose table has the given columns."""
+        field_types = tuple(schema.fields.items())
+        upsert_sql = _build_upsert_sql(schema, tuple(schema.fields))
+        filter_fields = frozenset(schema.fields).union(_METADATA_FIELDS)
+        return cls(
+            schema=schema,
+            upsert_sql=upsert_sql,
+            select_by_pk_sql=(
+                f"SELECT * FROM {schema.name} WHERE {schema.primary_key} = ? AND _deleted = 0"
+            ),
+            delete_by_pk_sql=(
+                f"UPDATE {schema.name} SET _deleted = 1, _updated_at = ? "
+                f"WHERE {schema.primary_key} = ? AND _deleted = 0"
+            ),
+            field_types=field_types,
+            row_to_entity=_compile_row_reader(field_types, table_columns),
+            serializers=serializers,
+            upsert_statements={tuple(schema.fields): upsert_sql},
+            row_packers={},
+            update_statements={},
+            filter_fields=filter_fields,
+            filters=_compile_filters(sorted(filter_fields)),
+            pk_index=list(table_columns).index(schema.primary_key),
+            version_index=list(table_columns).index("_version"),
+            integer_pk=schema.fields.get(schema.primary_key) == FieldType.INTEGER,
+        )
 
 
 class SQLiteLocalFirstStorage:
@@ -35,30 +449,232 @@ class SQLiteLocalFirstStorage:
     - Full CRUD operations
     - Rich query filtering
     - Change tracking for sync
-    - Optional FTS (full-text search)
-
-    Vector search requires sqlite-vec extension (not included by default).
+    - Optional vector search (sqlite-vec, `vectors` extra)
     """
 
+    # Fixed attribute layout: no per-instance __dict__ on the CRUD hot path
+    __slots__ = (
+        "_config",
+        "_conn",
+        "_embedder",
+        "_group",
+        "_group_flush",
+        "_group_size",
+        "_idle_readers",
+        "_json_encoding",
+        "_optimize_task",
+        "_plans",
+        "_queued_writes",
+        "_readers",
+        "_row_cache",
+        "_savepoints",
+        "_txn_context",
+        "_txn_lock",
+        "_txn_owner",
+        "_vectors_loaded",
+        "_write_epoch",
+        "_writes_since_optimize",
+    )
+
     def __init__(self):
         """Initialize storage (call `initialize()` before use)."""
-        self._conn: aiosqlite.Connection | None = None
+        self._conn: _Connection | None = None
+        # Read-only connections (WAL mode), and those not currently in use
+        self._readers: list[_Connection] = []
+        self._idle_readers: asyncio.Queue[_Connection] | None = None
         self._config: StorageConfig | None = None
-        self._schemas: dict[str, Schema] = {}
+        self._plans: dict[str, _SchemaPlan] = {}
+        # How JSON fields are stored, as recorded in the database
+        self._json_encoding = "json"
+        # Recently read rows per collection, by entity ID, least recently
+        # used first; and a count of write transactions begun, which tells
+        # a read whether a write may have started while it ran
+        self._row_cache: dict[str, OrderedDict[str, Sequence[Any]]] = {}
+        self._write_epoch = 0
+        # Task holding the open transaction; tasks started inside the block
+        # inherit it through the context variable
+        self._txn_owner: asyncio.Task | None = None
+        self._txn_context: ContextVar[asyncio.Task | None] = ContextVar(
+            f"txn_owner_{id(self)}", default=None
+        )
+        self._txn_lock: asyncio.Lock | None = None
+        # Numbers savepoints so every nested block gets its own name
+        self._savepoints = 0
+        # Open transaction shared by concurrent standalone writes (group
+        # commit), resolved once it commits; writes waiting to join it; and
+        # the task that commits it if the last writer leaves it open
+        self._group: asyncio.Future[None] | None = None
+        self._group_size = 0
+        self._group_flush: asyncio.Task | None = None
+        self._queued_writes = 0
+        # Writes since the planner statistics were last refreshed, and the
+        # task refreshing them
+        self._writes_since_optimize = 0
+        self._optimize_task: asyncio.Task | None = None
+        # sqlite-vec is loaded on every connection; the embedding model is
+        # loaded on first use
+        self._vectors_loaded = False
+        self._embedder: Any = None
 
     async def initialize(self, config: StorageConfig) -> None:
         """Initialize storage with configuration."""
+        if sqlite3.sqlite_version_info < _MIN_SQLITE_VERSION:
+            raise StorageError(
+                f"SQLite {'.'.join(map(str, _MIN_SQLITE_VERSION))} or newer is required "
+                f"(found {sqlite3.sqlite_version})"
+            )
+        if config.driver not in _DRIVERS:
+            raise StorageError(
+                f"Invalid driver '{config.driver}'. Expected one of: {sorted(_DRIVERS)}"
+            )
         self._config = config
-        db_path = Path(config.db_path).expanduser()
+        if config.uri:
+            db_path: str | Path = config.db_path
+        else:
+            db_path = Path(config.db_path).expanduser()
+
+            # Ensure directory exists
+            db_path.parent.mkdir(parents=True, exist_ok=True)
 
-        # Ensure directory exists
-        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = await self._connect(db_path)
+        self._txn_lock = asyncio.Lock()
 
-        self._conn = await aiosqlite.connect(db_path)
-        self._conn.row_factory = aiosqlite.Row
+        await self._apply_pragmas(config)
+        if config.enable_vectors:
+            self._vectors_loaded = await self._load_vector_extension(self._conn)
 
         # Create system tables
         await self._create_system_tables()
+        await self._load_json_encoding(config)
+
+        await self._open_readers(db_path, config)
+
+    async def _connect(self, db_path: str | Path) -> _Connection:
+        """Open a connection with the configured driver."""
+        config = self._config
+        assert config is not None
+        if config.driver == "apsw":
+            try:
+                from amplifier_module_storage_localfirst import _apsw
+            except ImportError as e:
+                raise StorageError("The apsw driver needs apsw. Install the 'apsw' extra.") from e
+            return await _apsw.connect(db_path, uri=config.uri)
+
+        # Rows stay plain tuples; readers index them by precomputed position
+        return await aiosqlite.connect(db_path, uri=config.uri)
+
+    async def _apply_pragmas(self, config: StorageConfig) -> None:
+        """Apply connection-level SQLite tuning from config."""
+        settings = {
+            "journal_mode": (config.journal_mode, _JOURNAL_MODES),
+            "synchronous": (config.synchronous, _SYNCHRONOUS_LEVELS),
+            "temp_store": (config.temp_store, _TEMP_STORES),
+        }
+        pragmas = []
+        for name, (value, allowed) in settings.items():
+            value = value.upper()
+            if value not in allowed:
+                raise StorageError(
+                    f"Invalid {name} '{value}'. Expected one of: {sorted(allowed)}"
+                )
+            pragmas.append(f"PRAGMA {name} = {value};")
+
+        # Negative cache_size is in KiB rather than pages
+        pragmas.append(f"PRAGMA cache_size = -{int(config.cache_size_kb)};")
+        pragmas.append(f"PRAGMA mmap_size = {int(config.mmap_size_bytes)};")
+        pragmas.append(f"PRAGMA busy_timeout = {_BUSY_TIMEOUT_MS};")
+
+        await self.conn.executescript("\n".join(pragmas))
+
+    async def _open_readers(self, db_path: str | Path, config: StorageConfig) -> None:
+        """Open the pool of read-only connections.
+
+        Only WAL lets readers run alongside a writer; in other journal
+        modes (including in-memory databases, which cannot use WAL) all
+        reads stay on the writer connection.
+        """
+        if config.reader_pool_size <= 0:
+            return
+        cursor = await self.conn.execute("PRAGMA journal_mode")
+        (journal_mode,) = await cursor.fetchone()
+        if journal_mode.upper() != "WAL":
+            return
+
+        self._idle_readers = asyncio.Queue()
+        for _ in range(config.reader_pool_size):
+            reader = await self._connect(db_path)
+            self._readers.append(reader)
+            await reader.executescript(f"""
+                PRAGMA query_only = ON;
+                PRAGMA cache_size = -{int(config.cache_size_kb)};
+                PRAGMA mmap_size = {int(config.mmap_size_bytes)};
+                PRAGMA temp_store = {config.temp_store.upper()};
+                PRAGMA busy_timeout = {_BUSY_TIMEOUT_MS};
+            """)
+            if self._vectors_loaded:
+                await self._load_vector_extension(reader)
+            self._idle_readers.put_nowait(reader)
+
+    async def _load_vector_extension(self, conn: _Connection) -> bool:
+        """Load sqlite-vec into a connection.
+
+        Returns False when the extension is not installed or this Python's
+        sqlite3 module cannot load extensions; vector search then stays
+        unavailable but the rest of the storage works.
+        """
+        try:
+            import sqlite_vec
+        except ImportError:
+            return False
+
+        try:
+            await conn.enable_load_extension(True)
+        except AttributeError:  # sqlite3 built without extension loading
+            return False
+        try:
+            await conn.load_extension(sqlite_vec.loadable_path())
+        finally:
+            await conn.enable_load_extension(False)
+        return True
+
+    @asynccontextmanager
+    async def _reader(self) -> AsyncIterator[_Connection]:
+        """Borrow a connection for a read.
+
+        Reads go to an idle pooled reader, which sees only committed data.
+        A task inside its own transaction reads through the writer so it
+        sees its uncommitted writes. When there is no idle reader (no pool,
+        or every reader busy), a task started from inside a transaction
+        reads through it too, and other reads also use the writer, but
+        only between transactions: the read waits for the write lock and
+        commits any open group first, so it never sees another task's
+        uncommitted writes. Such a read holds the lock until it ends.
+        """
+        idle = self._idle_readers
+        owner = self._txn_owner
+        if owner is not None and owner is asyncio.current_task():
+            yield self.conn
+            return
+
+        if idle is not None and not idle.empty():
+            reader = idle.get_nowait()
+            try:
+                yield reader
+            finally:
+                idle.put_nowait(reader)
+            return
+
+        if owner is not None and self._txn_context.get() is owner:
+            # Waiting for the lock would deadlock if the owner awaits this task
+            yield self.conn
+            return
+
+        lock = self._txn_lock
+        assert lock is not None  # Created alongside the connection
+        async with lock:
+            if self._group is not None:
+                await self._commit_group()
+            yield self.conn
 
     async def _create_system_tables(self) -> None:
         """Create internal system tables for tracking changes."""
@@ -70,25 +686,157 @@ class SQLiteLocalFirstStorage:
                 entity_id TEXT NOT NULL,
                 operation TEXT NOT NULL,
                 data TEXT,
-                timestamp TEXT NOT NULL
+                timestamp INTEGER NOT NULL  -- Microseconds since the Unix epoch
             );
 
-            CREATE INDEX IF NOT EXISTS idx_pending_changes_collection
-                ON _pending_changes(collection);
-
             -- Track sync state
             CREATE TABLE IF NOT EXISTS _sync_state (
                 key TEXT PRIMARY KEY,
                 value TEXT NOT NULL
             );
+
+            -- Settings fixed when the database is created
+            CREATE TABLE IF NOT EXISTS _settings (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+
+            -- Live (non-deleted) entity count per collection, kept by triggers
+            CREATE TABLE IF NOT EXISTS _counts (
+                collection TEXT PRIMARY KEY,
+                n INTEGER NOT NULL
+            );
+        """)
+
+        await self._migrate_pending_timestamps()
+        await self.conn.executescript("""
+            CREATE INDEX IF NOT EXISTS idx_pending_changes_collection
+                ON _pending_changes(collection);
+
+            CREATE INDEX IF NOT EXISTS idx_pending_changes_timestamp
+                ON _pending_changes(timestamp);
         """)
-        await self.conn.commit()
+
+    async def _load_json_encoding(self, config: StorageConfig) -> None:
+        """Check `json_encoding` against the one the database was created with.
+
+        The encoding is recorded on first use, so a database is always
+        read and written the same way, whatever extras are installed.
+        """
+        encoding = config.json_encoding
+        if encoding not in _JSON_ENCODINGS:
+            raise StorageError(
+                f"Invalid json_encoding '{encoding}'. Expected one of: {sorted(_JSON_ENCODINGS)}"
+            )
+
+        cursor = await self.conn.execute(
+            "SELECT value FROM _settings WHERE key = 'json_encoding'"
+        )
+        row = await cursor.fetchone()
+        if row is None:
+            await self.conn.execute(
+                "INSERT INTO _settings (key, value) VALUES ('json_encoding', ?)", (encoding,)
+            )
+            await self.conn.commit()
+        elif row[0] != encoding:
+            raise StorageError(
+                f"This database stores JSON fields as {row[0]}; "
+                f"open it with json_encoding='{row[0]}'"
+            )
+
+        if encoding == "msgpack" and not _msgpack.available:
+            raise StorageError(
+                "json_encoding='msgpack' needs msgpack. Install the 'speedups' extra."
+            )
+        self._json_encoding = encoding
+
+    async def _migrate_pending_timestamps(self) -> None:
+        """Convert an ISO-8601 TEXT timestamp column to epoch microseconds.
+
+        Databases created by earlier versions declared the column as TEXT,
+        whose affinity would turn integers back into strings, so the table
+        is rebuilt rather than updated in place.
+        """
+        cursor = await self.conn.execute("PRAGMA table_info(_pending_changes)")
+        column_types = {row[1]: row[2] for row in await cursor.fetchall()}  # name, type
+        if column_types.get("timestamp") != "TEXT":
+            return
+
+        conn = self.conn
+        async with self._write_scope():
+            # Converted in Python: julianday() float math is not exact to the µs
+            cursor = await conn.execute("SELECT id, timestamp FROM _pending_changes")
+            stamps = [
+                (_epoch_micros(datetime.fromisoformat(timestamp)), change_id)
+                for change_id, timestamp in await cursor.fetchall()
+            ]
+
+            await conn.execute("ALTER TABLE _pending_changes RENAME TO _pending_changes_old")
+            await conn.execute("DROP INDEX IF EXISTS idx_pending_changes_collection")
+            await conn.execute("""
+                CREATE TABLE _pending_changes (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    collection TEXT NOT NULL,
+                    entity_id TEXT NOT NULL,
+                    operation TEXT NOT NULL,
+                    data TEXT,
+                    timestamp INTEGER NOT NULL
+                )
+            """)
+            await conn.execute("""
+                INSERT INTO _pending_changes (id, collection, entity_id, operation, data, timestamp)
+                SELECT id, collection, entity_id, operation, data, 0 FROM _pending_changes_old
+            """)
+            await conn.executemany(
+                "UPDATE _pending_changes SET timestamp = ? WHERE id = ?", stamps
+            )
+            await conn.execute("DROP TABLE _pending_changes_old")
 
     async def register_collection(self, schema: Schema) -> None:
         """Register a collection with its schema."""
         self._validate_schema(schema)
-        self._schemas[schema.name] = schema
-        await self._create_collection_table(schema)
+        dimensions = None
+        if schema.vector_field and self.has_vector_search:
+            model = await self._embedding_model()
+            dimensions = model.get_sentence_embedding_dimension()
+
+        await self._execute_ddl(self._collection_ddl(schema, dimensions))
+        cursor = await self.conn.execute(f"PRAGMA table_info({schema.name})")
+        table_columns = [row[1] for row in await cursor.fetchall()]  # name
+
+        # Replaces any plan (and cached statements) from a previous definition
+        self._plans[schema.name] = _SchemaPlan.build(
+            schema, table_columns, _JSON_ENCODINGS[self._json_encoding]
+        )
+        self._evict_rows(schema.name)
+
+    async def _execute_ddl(self, statements: list[str]) -> None:
+        """Run schema statements as one transaction in a single round-trip.
+
+        Inside the caller's own transaction they simply join it, one
+        statement at a time (executescript would commit it first).
+        """
+        conn = self.conn
+        lock = self._txn_lock
+        assert lock is not None  # Created alongside the connection
+        owner = self._txn_owner
+        if owner is not None and owner is asyncio.current_task():
+            for statement in statements:
+                await conn.execute(statement)
+            return
+
+        self._check_not_inherited(owner)
+        async with lock:
+            self._write_epoch += 1
+            if self._group is not None:
+                await self._commit_group()
+            try:
+                await conn.executescript(
+                    "BEGIN IMMEDIATE;\n" + ";\n".join(statements) + ";\nCOMMIT;"
+                )
+            except BaseException:
+                await conn.rollback()
+                raise
 
     def _validate_schema(self, schema: Schema) -> None:
         """Validate schema definition."""
@@ -100,9 +848,18 @@ class SQLiteLocalFirstStorage:
             raise SchemaError(f"Primary key '{schema.primary_key}' not in fields")
         if schema.vector_field and schema.vector_field not in schema.fields:
             raise SchemaError(f"Vector field '{schema.vector_field}' not in fields")
+        for index in schema.indexes or []:
+            for field in (index,) if isinstance(index, str) else index:
+                if field not in schema.fields:
+                    raise SchemaError(f"Index field '{field}' not in fields")
+
+    def _collection_ddl(self, schema: Schema, dimensions: int | None) -> list[str]:
+        """Statements creating a collection's table, indexes and triggers.
 
-    async def _create_collection_table(self, schema: Schema) -> None:
-        """Create table for a collection."""
+        `dimensions` is the embedding size when the collection gets a
+        vector table.
+        """
+        name = schema.name
         columns = []
 
         for field_name, field_type in schema.fields.items():
@@ -120,21 +877,96 @@ class SQLiteLocalFirstStorage:
             "_version INTEGER DEFAULT 1",
         ])
 
-        await self.conn.execute(f"""
-            CREATE TABLE IF NOT EXISTS {schema.name} (
-                {', '.join(columns)}
+        statements = [f"CREATE TABLE IF NOT EXISTS {name} ({', '.join(columns)})"]
+
+        # Every read filters on `_deleted = 0`, so partial indexes over live
+        # rows are smaller and can satisfy those queries directly. Full
+        # single-field indexes created by earlier versions are replaced.
+        for index in schema.indexes or []:
+            index_fields = (index,) if isinstance(index, str) else tuple(index)
+            index_name = f"idx_{name}_{'_'.join(index_fields)}"
+            if isinstance(index, str):
+                statements.append(f"DROP INDEX IF EXISTS {index_name}")
+            statements.append(
+                f"CREATE INDEX IF NOT EXISTS {index_name}_live "
+                f"ON {name}({', '.join(index_fields)}) WHERE _deleted = 0"
             )
-        """)
 
-        # Create indexes
-        for index_field in schema.indexes or []:
-            await self.conn.execute(f"""
-                CREATE INDEX IF NOT EXISTS
-                idx_{schema.name}_{index_field}
-                ON {schema.name}({index_field})
-            """)
+        # For change scans ordered by modification time
+        statements.append(
+            f"CREATE INDEX IF NOT EXISTS idx_{name}_updated "
+            f"ON {name}(_updated_at) WHERE _deleted = 0"
+        )
+
+        statements.extend(self._count_trigger_ddl(name))
+
+        if dimensions is not None:
+            statements.extend(self._vector_ddl(schema, dimensions))
+        return statements
 
-        await self.conn.commit()
+    def _vector_ddl(self, schema: Schema, dimensions: int) -> list[str]:
+        """Statements creating the sqlite-vec table of a collection's embeddings.
+
+        Embeddings are stored as int8 (a quarter of the float32 size) and
+        keyed by the entity row's rowid. Triggers drop an
+        embedding when its text changes or the entity is deleted; rows
+        without one are embedded by `semantic_search` before it searches.
+        """
+        name = schema.name
+        field = schema.vector_field
+        return [
+            f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS vec_{name}
+            USING vec0(embedding int8[{dimensions}])
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS _vec_{name}_update
+            AFTER UPDATE OF {field}, _deleted ON {name}
+            WHEN OLD.{field} IS NOT NEW.{field} OR NEW._deleted = 1
+            BEGIN
+                DELETE FROM vec_{name} WHERE rowid = OLD.rowid;
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS _vec_{name}_delete
+            AFTER DELETE ON {name}
+            BEGIN
+                DELETE FROM vec_{name} WHERE rowid = OLD.rowid;
+            END
+            """,
+        ]
+
+    def _count_trigger_ddl(self, name: str) -> list[str]:
+        """Statements keeping `_counts` in step with a collection's live rows."""
+        return [
+            f"""
+            CREATE TRIGGER IF NOT EXISTS _count_{name}_insert
+            AFTER INSERT ON {name} WHEN NEW._deleted = 0
+            BEGIN
+                UPDATE _counts SET n = n + 1 WHERE collection = '{name}';
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS _count_{name}_update
+            AFTER UPDATE OF _deleted ON {name} WHEN OLD._deleted != NEW._deleted
+            BEGIN
+                UPDATE _counts SET n = n + OLD._deleted - NEW._deleted
+                WHERE collection = '{name}';
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS _count_{name}_delete
+            AFTER DELETE ON {name} WHEN OLD._deleted = 0
+            BEGIN
+                UPDATE _counts SET n = n - 1 WHERE collection = '{name}';
+            END
+            """,
+            # Seed from the table itself (also repairs a stale counter)
+            (
+                f"INSERT OR REPLACE INTO _counts (collection, n) "
+                f"SELECT '{name}', COUNT(*) FROM {name} WHERE _deleted = 0"
+            ),
+        ]
 
     def _field_type_to_sql(self, field_type: FieldType) -> str:
         """Convert FieldType to SQLite type."""
@@ -145,214 +977,763 @@ class SQLiteLocalFirstStorage:
             FieldType.BOOLEAN: "INTEGER",
             FieldType.DATETIME: "TEXT",
             FieldType.DATE: "TEXT",
-            FieldType.JSON: "TEXT",
+            FieldType.JSON: "BLOB" if self._json_encoding == "msgpack" else "TEXT",
         }
         return mapping.get(field_type, "TEXT")
 
     async def close(self) -> None:
         """Clean up resources."""
+        if self._optimize_task is not None:
+            await self._optimize_task
+            self._optimize_task = None
+        if self._group is not None:
+            await self._flush()
+        if self._conn:
+            # Refresh planner statistics for the next session
+            await self._conn.execute("PRAGMA optimize")
+        for reader in self._readers:
+            await reader.close()
+        self._readers = []
+        self._idle_readers = None
+        self._row_cache.clear()
         if self._conn:
             await self._conn.close()
             self._conn = None
 
     @property
-    def conn(self) -> aiosqlite.Connection:
+    def conn(self) -> _Connection:
         """Get connection, raising if not initialized."""
         if self._conn is None:
             raise RuntimeError("Storage not initialized. Call initialize() first.")
         return self._conn
 
-    def _ensure_collection(self, collection: str) -> Schema:
-        """Ensure collection is registered and return schema."""
-        if collection not in self._schemas:
+    def _ensure_collection(self, collection: str) -> _SchemaPlan:
+        """Ensure collection is registered and return its plan."""
+        plan = self._plans.get(collection)
+        if plan is None:
             raise SchemaError(f"Collection '{collection}' not registered")
-        return self._schemas[collection]
+        return plan
+
+    # === Transactions ===
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[None]:
+        """Group writes into a single transaction.
+
+        Commits on exit and rolls back if the block raises. Storage calls
+        made inside the block join it. Nested use of transaction() in the
+        same task creates a savepoint, so an inner block can fail without
+        discarding the outer one. Other tasks wait for the
+        transaction to finish before starting their own, and their reads
+        never see its uncommitted writes. Tasks started from inside the
+        block may read through it but cannot write until it ends.
+        """
+        conn = self.conn
+        lock = self._txn_lock
+        assert lock is not None  # Created alongside the connection
+        task = asyncio.current_task()
+        owner = self._txn_owner
+
+        if owner is not None and owner is task:
+            self._savepoints += 1
+            savepoint = f"_txn_{self._savepoints}"
+            await conn.execute(f"SAVEPOINT {savepoint}")
+            try:
+                yield
+            except BaseException:
+                await conn.execute(f"ROLLBACK TO {savepoint}")
+                await conn.execute(f"RELEASE {savepoint}")
+                raise
+            else:
+                await conn.execute(f"RELEASE {savepoint}")
+            return
+
+        self._check_not_inherited(owner)
+        await lock.acquire()
+        self._write_epoch += 1
+        try:
+            if self._group is not None:
+                await self._commit_group()
+            await conn.execute("BEGIN IMMEDIATE")
+        except BaseException:
+            lock.release()
+            raise
+
+        self._txn_owner = task
+        token = self._txn_context.set(task)
+        try:
+            yield
+        except BaseException:
+            await conn.rollback()
+            raise
+        else:
+            await conn.commit()
+        finally:
+            self._txn_context.reset(token)
+            self._txn_owner = None
+            lock.release()
+
+    def _check_not_inherited(self, owner: asyncio.Task | None) -> None:
+        """Refuse writes from a task started inside another task's transaction."""
+        if owner is not None and self._txn_context.get() is owner:
+            # Waiting would deadlock if the owner awaits this task, and
+            # sharing the connection would let either side roll back the
+            # other's writes
+            raise StorageError(
+                "Cannot write from a task started inside another task's transaction(); "
+                "await the call in the task that opened it"
+            )
+
+    @asynccontextmanager
+    async def _write_scope(self) -> AsyncIterator[None]:
+        """Scope for a storage call's writes.
+
+        Joins the calling task's open transaction as-is (no savepoint, so
+        no extra round-trips per write). Otherwise the call's writes are
+        group-committed: when other writes are already waiting for the
+        connection, the transaction is left open for them to add to, and
+        the last one commits it. Each call still returns only after its
+        writes are committed, and a failing call rolls back only its own
+        writes (joining calls run in a savepoint).
+        """
+        conn = self.conn
+        lock = self._txn_lock
+        assert lock is not None  # Created alongside the connection
+        self._count_write()
+        task = asyncio.current_task()
+        owner = self._txn_owner
+        if owner is not None and owner is task:
+            yield
+            return
+
+        self._check_not_inherited(owner)
+        self._queued_writes += 1
+        try:
+            await lock.acquire()
+        finally:
+            self._queued_writes -= 1
+        self._write_epoch += 1
+
+        group = self._group
+        savepoint = None
+        try:
+            if group is None:
+                await conn.execute("BEGIN IMMEDIATE")
+                group = self._group = asyncio.get_running_loop().create_future()
+                self._group_size = 0
+            else:
+                self._savepoints += 1
+                savepoint = f"_txn_{self._savepoints}"
+                await conn.execute(f"SAVEPOINT {savepoint}")
+        except BaseException:
+            lock.release()
+            raise
+
+        self._txn_owner = task
+        token = self._txn_context.set(task)
+        try:
+            yield
+        except BaseException:
+            if savepoint is None:
+                # First in the group, so nothing else to keep
+                self._group = None
+                await conn.rollback()
+            else:
+                await conn.execute(f"ROLLBACK TO {savepoint}")
+                await conn.execute(f"RELEASE {savepoint}")
+            raise
+        else:
+            if savepoint is not None:
+                await conn.execute(f"RELEASE {savepoint}")
+            self._group_size += 1
+        finally:
+            self._txn_context.reset(token)
+            self._txn_owner = None
+            try:
+                if self._group is not None:
+                    if self._queued_writes and self._group_size < _MAX_GROUP_WRITES:
+                        # Leave it open for the waiting writes; should they
+                        # be cancelled, the flush still commits it
+                        if self._group_flush is None or self._group_flush.done():
+                            self._group_flush = asyncio.ensure_future(self._flush())
+                    else:
+                        await self._commit_group()
+            finally:
+                lock.release()
+
+        # Shielded: cancelling one writer must not fail the others
+        await asyncio.shield(group)
+
+    async def _commit_group(self) -> None:
+        """Commit the group transaction (lock held) and wake its writers."""
+        group = self._group
+        assert group is not None
+        self._group = None
+        try:
+            await self.conn.commit()
+        except BaseException as e:
+            group.set_exception(e)
+            await self.conn.rollback()
+            raise
+        else:
+            group.set_result(None)
+
+    async def _flush(self) -> None:
+        """Commit the open group transaction, if any."""
+        lock = self._txn_lock
+        assert lock is not None
+        async with lock:
+            if self._group is not None:
+                await self._commit_group()
+
+    def _count_write(self) -> None:
+        """Count a write, refreshing planner statistics every `analyze_every`."""
+        every = self._config.analyze_every if self._config is not None else 0
+        if every <= 0:
+            return
+        self._writes_since_optimize += 1
+        if self._writes_since_optimize >= every and (
+            self._optimize_task is None or self._optimize_task.done()
+        ):
+            self._writes_since_optimize = 0
+            self._optimize_task = asyncio.ensure_future(self._optimize())
+
+    async def _optimize(self) -> None:
+        """Run `PRAGMA optimize` (ANALYZE where statistics are stale)."""
+        # Started by a write, maybe inside a transaction; this task only
+        # waits for it rather than sharing it
+        self._txn_context.set(None)
+        async with self._write_scope():
+            await self.conn.execute("PRAGMA optimize")
+
+    # === Row Cache ===
+
+    def _writing(self) -> bool:
+        """Whether a write transaction is open or committing."""
+        lock = self._txn_lock
+        return self._group is not None or (lock is not None and lock.locked())
+
+    def _row_cache_size(self) -> int:
+        return self._config.row_cache_size if self._config is not None else 0
+
+    def _cached_row(self, collection: str, entity_id: str) -> Sequence[Any] | None:
+        """Get the cached row of a live entity, if any."""
+        rows = self._row_cache.get(collection)
+        if rows is None:
+            return None
+        row = rows.get(entity_id)
+        if row is not None:
+            rows.move_to_end(entity_id)
+        return row
+
+    def _cache_row(self, collection: str, entity_id: str, row: Sequence[Any], epoch: int) -> None:
+        """Cache a row read or written since `epoch`.
+
+        Only committed data is cached: the row is dropped if a write
+        transaction has begun since `epoch` or is still open.
+        """
+        size = self._row_cache_size()
+        if size <= 0 or epoch != self._write_epoch or self._writing():
+            return
+        rows = self._row_cache.setdefault(collection, OrderedDict())
+        rows[entity_id] = row
+        rows.move_to_end(entity_id)
+        if len(rows) > size:
+            rows.popitem(last=False)
+
+    def _evict_rows(self, collection: str, entity_id: str | None = None) -> None:
+        """Drop one cached row, or every cached row of a collection."""
+        if entity_id is None:
+            self._row_cache.pop(collection, None)
+        else:
+            rows = self._row_cache.get(collection)
+            if rows is not None:
+                rows.pop(entity_id, None)
 
     # === CRUD Operations ===
 
+    def collection(self, name: str) -> SQLiteCollection:
+        """Get a handle bound to a registered collection."""
+        return SQLiteCollection(self, self._ensure_collection(name))
+
     async def save(self, collection: str, entity: dict) -> str:
         """Save an entity (create or update)."""
-        schema = self._ensure_collection(collection)
+        return await self._save(self._ensure_collection(collection), entity)
+
+    async def _save(self, plan: _SchemaPlan, entity: dict) -> str:
+        """Save an entity into an already-resolved collection."""
+        schema = plan.schema
         pk = schema.primary_key
 
-        # Generate ID if not present
-        if pk not in entity or entity[pk] is None:
-            entity = {**entity, pk: str(uuid.uuid4())}
+        # Generate ID if not present; an integer one is assigned by SQLite
+        # when the row is inserted
+        if entity.get(pk) is None:
+            entity = {**entity, pk: None if plan.integer_pk else _new_id()}
 
         entity_id = entity[pk]
-        now = datetime.now(timezone.utc).isoformat()
+        now, changed_at = _now()
+
+        columns = tuple(name for name, _ in plan.field_types if name in entity)
+        values = self._row_packer(plan, columns)(entity, now, now)
+        sql = self._upsert_sql(plan, columns)
+        conn = self.conn
+        row = None
+
+        async with self._write_scope():
+            epoch = self._write_epoch
+            exists = False
+            if entity_id is not None:
+                self._evict_rows(schema.name, entity_id)
+            if _HAS_RETURNING and (self.supports_sync or self._row_cache_size() > 0):
+                # The written row, for the row cache and the change log
+                cursor = await conn.execute(f"{sql} RETURNING *", values)
+                row = await cursor.fetchone()
+                if entity_id is None:
+                    entity_id = row[plan.pk_index]
+            else:
+                if self.supports_sync and entity_id is not None:
+                    cursor = await conn.execute(
+                        f"SELECT 1 FROM {schema.name} WHERE {pk} = ?", (entity_id,)
+                    )
+                    exists = await cursor.fetchone() is not None
+                cursor = await conn.execute(sql, values)
+                if entity_id is None:
+                    entity_id = cursor.lastrowid
+            if entity[pk] is None:
+                entity[pk] = entity_id  # Our copy, made above
+
+            # One statement creates or updates; the change log needs to know which
+            if self.supports_sync:
+                if row is not None:
+                    exists = row[plan.version_index] > 1
+                operation = "update" if exists else "create"
+                await self._track_change(schema.name, entity_id, operation, entity, changed_at)
+
+        if row is not None:
+            self._cache_row(schema.name, entity_id, row, epoch)
+        return entity_id
 
-        # Check if exists
-        existing = await self.get(collection, entity_id)
+    async def get(self, collection: str, entity_id: str) -> dict | None:
+        """Get an entity by ID."""
+        return await self._get(self._ensure_collection(collection), entity_id)
 
-        if existing:
-            # Update
-            await self._update_entity(collection, entity_id, entity, schema)
-        else:
-            # Insert
-            await self._insert_entity(collection, entity, schema, now)
+    async def _get(self, plan: _SchemaPlan, entity_id: str) -> dict | None:
+        """Get an entity by ID from an already-resolved collection."""
+        collection = plan.schema.name
+        row = self._cached_row(collection, entity_id)
+        if row is not None:
+            return plan.row_to_entity(row)
 
-        return entity_id
+        epoch = self._write_epoch
+        async with self._reader() as conn:
+            cursor = await conn.execute(plan.select_by_pk_sql, (entity_id,))
+            row = await cursor.fetchone()
 
-    async def _insert_entity(
-        self,
-        collection: str,
-        entity: dict,
-        schema: Schema,
-        now: str,
-    ) -> None:
-        """Insert a new entity."""
-        columns = []
-        placeholders = []
-        values = []
+        if row is None:
+            return None
 
-        for field_name in schema.fields:
-            if field_name in entity:
-                columns.append(field_name)
-                placeholders.append("?")
-                values.append(self._serialize_value(entity[field_name], schema.fields[field_name]))
+        self._cache_row(collection, entity_id, row, epoch)
+        return plan.row_to_entity(row)
 
-        # Add metadata
-        columns.extend(["_created_at", "_updated_at", "_deleted", "_version"])
-        placeholders.extend(["?", "?", "?", "?"])
-        values.extend([now, now, 0, 1])
+    async def update(self, collection: str, entity_id: str, changes: dict) -> dict:
+        """Partial update of an entity."""
+        return await self._update(self._ensure_collection(collection), entity_id, changes)
 
-        await self.conn.execute(
-            f"INSERT INTO {collection} ({', '.join(columns)}) VALUES ({', '.join(placeholders)})",
-            values,
-        )
-        await self.conn.commit()
+    async def _update(self, plan: _SchemaPlan, entity_id: str, changes: dict) -> dict:
+        """Partial update of an entity in an already-resolved collection.
 
-        # Track change for sync
-        await self._track_change(collection, entity[schema.primary_key], "create", entity)
+        One UPDATE sets only the changed fields and, where RETURNING is
+        available, also reads back the updated row.
+        """
+        schema = plan.schema
+        pk = schema.primary_key
+        columns = tuple(
+            name for name, _ in plan.field_types if name in changes and name != pk
+        )
+        now, changed_at = _now()
+        values = self._row_packer(plan, columns)(changes, now, entity_id)
+        sql = plan.update_statements.get(columns)
+        if sql is None:
+            assignments = "".join(f"{name} = ?, " for name in columns)
+            sql = plan.update_statements[columns] = (
+                f"UPDATE {schema.name} SET {assignments}_updated_at = ?, _version = _version + 1 "
+                f"WHERE {pk} = ? AND _deleted = 0"
+            )
+        conn = self.conn
+        row = None
+
+        async with self._write_scope():
+            epoch = self._write_epoch
+            self._evict_rows(schema.name, entity_id)
+            if _HAS_RETURNING:
+                cursor = await conn.execute(f"{sql} RETURNING *", values)
+                row = await cursor.fetchone()
+                updated = None if row is None else plan.row_to_entity(row)
+            else:
+                cursor = await conn.execute(sql, values)
+                updated = await self._get(plan, entity_id) if cursor.rowcount else None
+            if updated is None:
+                raise NotFoundError(schema.name, entity_id)
 
-    async def _update_entity(
-        self,
-        collection: str,
-        entity_id: str,
-        entity: dict,
-        schema: Schema,
-    ) -> None:
-        """Update an existing entity."""
-        now = datetime.now(timezone.utc).isoformat()
-        updates = []
-        values = []
+            await self._track_change(schema.name, entity_id, "update", updated, changed_at)
 
-        for field_name in schema.fields:
-            if field_name in entity and field_name != schema.primary_key:
-                updates.append(f"{field_name} = ?")
-                values.append(self._serialize_value(entity[field_name], schema.fields[field_name]))
+        if row is not None:
+            self._cache_row(schema.name, entity_id, row, epoch)
+        return updated
 
-        updates.append("_updated_at = ?")
-        values.append(now)
-        updates.append("_version = _version + 1")
+    async def delete(self, collection: str, entity_id: str) -> bool:
+        """Delete an entity (soft delete)."""
+        return await self._delete(self._ensure_collection(collection), entity_id)
 
-        values.append(entity_id)
+    async def _delete(self, plan: _SchemaPlan, entity_id: str) -> bool:
+        """Delete an entity (soft delete) from an already-resolved collection."""
+        collection = plan.schema.name
+        now, changed_at = _now()
 
-        await self.conn.execute(
-            f"UPDATE {collection} SET {', '.join(updates)} WHERE {schema.primary_key} = ?",
-            values,
-        )
-        await self.conn.commit()
+        async with self._write_scope():
+            self._evict_rows(collection, entity_id)
+            cursor = await self.conn.execute(plan.delete_by_pk_sql, (now, entity_id))
+            if cursor.rowcount == 0:
+                return False
 
-        # Track change for sync
-        await self._track_change(collection, entity_id, "update", entity)
+            # Track change for sync
+            await self._track_change(collection, entity_id, "delete", {}, changed_at)
 
-    def _serialize_value(self, value: Any, field_type: FieldType) -> Any:
-        """Serialize a value for storage."""
-        if value is None:
-            return None
-        if field_type == FieldType.JSON:
-            return json.dumps(value)
-        if field_type == FieldType.BOOLEAN:
-            return 1 if value else 0
-        if field_type == FieldType.DATETIME:
-            if isinstance(value, datetime):
-                return value.isoformat()
-            return value
-        if field_type == FieldType.DATE:
-            if hasattr(value, "isoformat"):
-                return value.isoformat()
-            return value
-        return value
-
-    def _deserialize_value(self, value: Any, field_type: FieldType) -> Any:
-        """Deserialize a value from storage."""
-        if value is None:
-            return None
-        if field_type == FieldType.JSON:
-            return json.loads(value) if isinstance(value, str) else value
-        if field_type == FieldType.BOOLEAN:
-            return bool(value)
-        if field_type == FieldType.INTEGER:
-            return int(value) if value is not None else None
-        if field_type == FieldType.FLOAT:
-            return float(value) if value is not None else None
-        return value
+        return True
 
-    async def get(self, collection: str, entity_id: str) -> dict | None:
-        """Get an entity by ID."""
-        schema = self._ensure_collection(collection)
+    # === Batch Operations ===
 
-        cursor = await self.conn.execute(
-            f"SELECT * FROM {collection} WHERE {schema.primary_key} = ? AND _deleted = 0",
-            (entity_id,),
+    async def save_many(
+        self,
+        collection: str,
+        entities: list[dict],
+        chunk_size: int = _BATCH_SIZE,
+    ) -> list[str]:
+        """Save multiple entities in a single transaction.
+
+        Rows are serialized and written `chunk_size` entities at a time
+        so memory stays bounded for very large batches; the whole call is
+        still one transaction.
+        """
+        plan = self._ensure_collection(collection)
+        schema = plan.schema
+        pk = schema.primary_key
+        if not entities:
+            return []
+
+        now, changed_at = _now()
+        field_names = tuple(name for name, _ in plan.field_types)
+        track = self.supports_sync
+        executemany = self.conn.executemany
+        seen: set[str] = set()
+
+        async with self._write_scope():
+            entities = await self._with_ids(plan, entities)
+            entity_ids = [entity[pk] for entity in entities]
+            self._evict_rows(collection)
+            for start in range(0, len(entities), chunk_size):
+                chunk = entities[start:start + chunk_size]
+                chunk_ids = entity_ids[start:start + chunk_size]
+
+                # Batch runs of consecutive rows with the same fields present so
+                # each run shares one statement; keeping runs (rather than
+                # grouping globally) preserves the order of writes to one id
+                batches: list[tuple[tuple[str, ...], list[tuple[Any, ...]]]] = []
+                for entity in chunk:
+                    columns = tuple(name for name in field_names if name in entity)
+                    if not batches or batches[-1][0] != columns:
+                        batches.append((columns, []))
+                        pack = self._row_packer(plan, columns)
+                    batches[-1][1].append(pack(entity, now, now))
+
+                # Only needed to tell creates from updates in the change log
+                if track:
+                    seen.update(await self._existing_ids(collection, schema, chunk_ids))
+
+                for columns, rows in batches:
+                    await executemany(self._upsert_sql(plan, columns), rows)
+
+                if track:
+                    changes = []
+                    for entity_id, entity in zip(chunk_ids, chunk):
+                        operation = "update" if entity_id in seen else "create"
+                        seen.add(entity_id)
+                        changes.append(
+                            (collection, entity_id, operation, _json.dumps(entity), changed_at)
+                        )
+                    await executemany(
+                        """
+                        INSERT INTO _pending_changes
+                            (collection, entity_id, operation, data, timestamp)
+                        VALUES (?, ?, ?, ?, ?)
+                        """,
+                        changes,
+                    )
+
+        return entity_ids
+
+    async def _with_ids(self, plan: _SchemaPlan, entities: list[dict]) -> list[dict]:
+        """Give entities saved without an ID a new one (inside a write scope).
+
+        New integer IDs continue from the largest in the table or the
+        batch, as SQLite itself picks rowids; others are UUIDv7 strings.
+        """
+        pk = plan.schema.primary_key
+        if not plan.integer_pk:
+            return [
+                entity if entity.get(pk) is not None else {**entity, pk: _new_id()}
+                for entity in entities
+            ]
+        if all(entity.get(pk) is not None for entity in entities):
+            return entities
+
+        cursor = await self.conn.execute(f"SELECT MAX({pk}) FROM {plan.schema.name}")
+        (largest,) = await cursor.fetchone()
+        next_id = max(
+            [largest or 0, *(entity[pk] for entity in entities if entity.get(pk) is not None)]
+        )
+        with_ids = []
+        for entity in entities:
+            if entity.get(pk) is None:
+                next_id += 1
+                entity = {**entity, pk: next_id}
+            with_ids.append(entity)
+        return with_ids
+
+    async def save_rows(
+        self,
+        collection: str,
+        columns: Sequence[str],
+        rows: Iterable[Sequence],
+    ) -> int:
+        """Save rows of positional values in a single transaction."""
+        plan = self._ensure_collection(collection)
+        schema = plan.schema
+        for name in columns:
+            if name not in schema.fields:
+                raise SchemaError(f"Field '{name}' not in collection '{collection}'")
+
+        # Change tracking needs per-entity data, so take the dict-based path,
+        # a bounded slice of rows at a time
+        if self.supports_sync:
+            saved = 0
+            row_iter = iter(rows)
+            async with self._write_scope():
+                while chunk := list(itertools.islice(row_iter, _BATCH_SIZE)):
+                    entities = [dict(zip(columns, row)) for row in chunk]
+                    saved += len(await self.save_many(collection, entities))
+            return saved
+
+        columns = tuple(columns)
+        generate_id = schema.primary_key not in columns
+        serializers = [plan.serializers.get(schema.fields[name], _identity) for name in columns]
+        now, _ = _now()
+        # Consumed on the connection's thread, so it gets its own ID pool
+        # rather than share the module one with the event loop
+        ids = _IdPool()
+
+        def params() -> Iterator[tuple[Any, ...]]:
+            for row in rows:
+                values = tuple(serialize(v) for serialize, v in zip(serializers, row))
+                if generate_id:
+                    # SQLite assigns integer IDs on insert
+                    values += (None if plan.integer_pk else next(ids),)
+                yield values + (now, now)
+
+        sql = self._upsert_sql(
+            plan, columns + (schema.primary_key,) if generate_id else columns
         )
-        row = await cursor.fetchone()
-
-        if row is None:
-            return None
 
-        return self._row_to_entity(row, schema)
+        async with self._write_scope():
+            self._evict_rows(collection)
+            cursor = await self.conn.executemany(sql, params())
 
-    def _row_to_entity(self, row: aiosqlite.Row, schema: Schema) -> dict:
-        """Convert database row to entity dict."""
-        entity = {}
+        return cursor.rowcount
 
-        for field_name, field_type in schema.fields.items():
-            if field_name in row.keys():
-                entity[field_name] = self._deserialize_value(row[field_name], field_type)
+    async def get_many(
+        self,
+        collection: str,
+        entity_ids: Sequence[str],
+    ) -> dict[str, dict | None]:
+        """Get multiple entities by ID in one round-trip per chunk."""
+        plan = self._ensure_collection(collection)
+        pk = plan.schema.primary_key
+
+        found: dict[str, dict | None] = dict.fromkeys(entity_ids)
+        ids = list(found)
+        async with self._reader() as conn:
+            for start in range(0, len(ids), _MAX_IN_PARAMS):
+                chunk = ids[start:start + _MAX_IN_PARAMS]
+                placeholders = ", ".join("?" * len(chunk))
+                cursor = await conn.execute(
+                    f"SELECT * FROM {collection} WHERE {pk} IN ({placeholders}) AND _deleted = 0",
+                    chunk,
+                )
+                for row in await cursor.fetchall():
+                    entity = plan.row_to_entity(row)
+                    found[entity[pk]] = entity
 
-        # Include metadata
-        entity["_created_at"] = row["_created_at"]
-        entity["_updated_at"] = row["_updated_at"]
-        entity["_version"] = row["_version"]
+        return found
 
-        return entity
+    async def update_many(self, collection: str, updates: dict[str, dict]) -> None:
+        """Partial update of multiple entities in a single transaction."""
+        plan = self._ensure_collection(collection)
+        schema = plan.schema
+        pk = schema.primary_key
+        if not updates:
+            return
 
-    async def update(self, collection: str, entity_id: str, changes: dict) -> dict:
-        """Partial update of an entity."""
-        schema = self._ensure_collection(collection)
+        now, changed_at = _now()
+
+        async with self._write_scope():
+            self._evict_rows(collection)
+            existing = await self.get_many(collection, list(updates))
+            for entity_id, entity in existing.items():
+                if entity is None:
+                    raise NotFoundError(collection, entity_id)
+
+            # Rows exist, so the upsert only ever takes its UPDATE branch
+            groups: dict[tuple[str, ...], list[tuple[Any, ...]]] = {}
+            for entity_id, changes in updates.items():
+                columns = tuple(name for name in schema.fields if name in changes and name != pk)
+                row = tuple(
+                    plan.serializers.get(schema.fields[name], _identity)(changes[name])
+                    for name in columns
+                )
+                groups.setdefault((pk, *columns), []).append((entity_id, *row, now, now))
+
+            for columns, rows in groups.items():
+                await self.conn.executemany(self._upsert_sql(plan, columns), rows)
+
+            if self.supports_sync:
+                await self.conn.executemany(
+                    """
+                    INSERT INTO _pending_changes
+                        (collection, entity_id, operation, data, timestamp)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    [
+                        (collection, entity_id, "update",
+                         _json.dumps({**existing[entity_id], **changes}), changed_at)
+                        for entity_id, changes in updates.items()
+                    ],
+                )
 
-        existing = await self.get(collection, entity_id)
-        if existing is None:
-            raise NotFoundError(collection, entity_id)
+    async def delete_many(self, collection: str, entity_ids: list[str]) -> int:
+        """Delete multiple entities (soft delete) in a single transaction."""
+        schema = self._ensure_collection(collection).schema
+        if not entity_ids:
+            return 0
 
-        # Merge changes
-        updated = {**existing, **changes}
-        await self.save(collection, updated)
+        now, changed_at = _now()
+        pk = schema.primary_key
+        unique_ids = list(dict.fromkeys(entity_ids))
+
+        async with self._write_scope():
+            self._evict_rows(collection)
+            if _HAS_RETURNING:
+                # Each chunk's UPDATE reports the IDs it deleted, so no
+                # existence check is needed first (one parameter is `now`)
+                existing: set[str] = set()
+                for start in range(0, len(unique_ids), _MAX_IN_PARAMS - 1):
+                    chunk = unique_ids[start:start + _MAX_IN_PARAMS - 1]
+                    placeholders = ", ".join("?" * len(chunk))
+                    cursor = await self.conn.execute(
+                        f"UPDATE {collection} SET _deleted = 1, _updated_at = ? "
+                        f"WHERE {pk} IN ({placeholders}) AND _deleted = 0 RETURNING {pk}",
+                        (now, *chunk),
+                    )
+                    existing.update(row[0] for row in await cursor.fetchall())
+                deleted = [entity_id for entity_id in unique_ids if entity_id in existing]
+            else:
+                existing = await self._existing_ids(collection, schema, unique_ids)
+                deleted = [entity_id for entity_id in unique_ids if entity_id in existing]
+                await self.conn.executemany(
+                    f"UPDATE {collection} SET _deleted = 1, _updated_at = ? WHERE {pk} = ?",
+                    [(now, entity_id) for entity_id in deleted],
+                )
 
-        return await self.get(collection, entity_id)  # type: ignore
+            if self.supports_sync:
+                await self.conn.executemany(
+                    """
+                    INSERT INTO _pending_changes
+                        (collection, entity_id, operation, data, timestamp)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    [(collection, entity_id, "delete", "{}", changed_at) for entity_id in deleted],
+                )
 
-    async def delete(self, collection: str, entity_id: str) -> bool:
-        """Delete an entity (soft delete)."""
-        schema = self._ensure_collection(collection)
+        return len(deleted)
 
-        existing = await self.get(collection, entity_id)
-        if existing is None:
-            return False
+    async def purge_deleted(self, collection: str, before: datetime | None = None) -> int:
+        """Permanently remove soft-deleted entities.
 
-        now = datetime.now(timezone.utc).isoformat()
-        await self.conn.execute(
-            f"UPDATE {collection} SET _deleted = 1, _updated_at = ? WHERE {schema.primary_key} = ?",
-            (now, entity_id),
+        Tombstones whose deletion is still in the change log are kept so
+        sync can push it; the rest deleted before `before` (naive datetimes
+        are taken as UTC), or all of them, are removed.
+        """
+        schema = self._ensure_collection(collection).schema
+        sql = (
+            f"DELETE FROM {collection} WHERE _deleted = 1 AND {schema.primary_key} NOT IN "
+            f"(SELECT entity_id FROM _pending_changes WHERE collection = ?)"
         )
-        await self.conn.commit()
+        params: list[Any] = [collection]
+        if before is not None:
+            # Same ISO-8601 UTC form as _now(), so the strings sort by time
+            sql += " AND _updated_at < ?"
+            params.append((_EPOCH + timedelta(microseconds=_epoch_micros(before))).isoformat())
 
-        # Track change for sync
-        await self._track_change(collection, entity_id, "delete", {})
+        async with self._write_scope():
+            cursor = await self.conn.execute(sql, params)
+        return cursor.rowcount
 
-        return True
+    async def truncate(self, collection: str) -> None:
+        """Remove every entity from a collection, keeping its table.
+
+        Rows are deleted outright and the removal is not recorded as
+        pending changes.
+        """
+        self._ensure_collection(collection)
+        async with self._write_scope():
+            self._evict_rows(collection)
+            await self.conn.execute(f"DELETE FROM {collection}")
+
+    def _row_packer(self, plan: _SchemaPlan, columns: tuple[str, ...]) -> Callable[..., tuple]:
+        """Get the row packer for the given columns, generated once per shape."""
+        packers = plan.row_packers
+        pack = packers.get(columns)
+        if pack is None:
+            pack = packers[columns] = _compile_row_packer(
+                plan.schema.fields, columns, plan.serializers
+            )
+        return pack
+
+    def _upsert_sql(self, plan: _SchemaPlan, columns: tuple[str, ...]) -> str:
+        """Get the upsert statement for the given columns, cached per shape."""
+        statements = plan.upsert_statements
+        sql = statements.get(columns)
+        if sql is None:
+            sql = statements[columns] = _build_upsert_sql(plan.schema, columns)
+        return sql
+
+    async def _existing_ids(
+        self,
+        collection: str,
+        schema: Schema,
+        entity_ids: list[str],
+    ) -> set[str]:
+        """Return which of the given IDs exist (and are not deleted)."""
+        existing: set[str] = set()
+        for start in range(0, len(entity_ids), _MAX_IN_PARAMS):
+            chunk = entity_ids[start:start + _MAX_IN_PARAMS]
+            placeholders = ", ".join("?" * len(chunk))
+            cursor = await self.conn.execute(
+                f"SELECT {schema.primary_key} FROM {collection} "
+                f"WHERE {schema.primary_key} IN ({placeholders}) AND _deleted = 0",
+                chunk,
+            )
+            existing.update(row[0] for row in await cursor.fetchall())
+        return existing
 
     # === Query Operations ===
 
@@ -364,104 +1745,150 @@ class SQLiteLocalFirstStorage:
         limit: int = 100,
         offset: int = 0,
     ) -> list[dict]:
-        """Query entities with filtering, sorting, pagination."""
-        schema = self._ensure_collection(collection)
+        """Query entities with filtering, sorting, pagination.
 
-        conditions = ["_deleted = 0"]
-        values: list[Any] = []
+        The result is bounded by `limit`, so all rows are fetched in one
+        round-trip and converted in a single pass.
+        """
+        plan = self._ensure_collection(collection)
+        select = self._build_select(plan, filter, sort, limit, offset)
+        if select is None:
+            return []
 
-        if filter:
-            for key, value in filter.items():
-                condition, vals = self._build_filter_condition(key, value)
-                conditions.append(condition)
-                values.extend(vals)
-
-        where_clause = " AND ".join(conditions)
-
-        # Build ORDER BY
-        order_clause = ""
-        if sort:
-            order_parts = []
-            for field, direction in sort:
-                dir_sql = "DESC" if direction.lower() == "desc" else "ASC"
-                order_parts.append(f"{field} {dir_sql}")
-            order_clause = f"ORDER BY {', '.join(order_parts)}"
-
-        query = f"""
-            SELECT * FROM {collection}
-            WHERE {where_clause}
-            {order_clause}
-            LIMIT ? OFFSET ?
+        async with self._reader() as conn:
+            cursor = await conn.execute(*select)
+            rows = await cursor.fetchall()
+
+        return list(map(plan.row_to_entity, rows))
+
+    async def query_iter(
+        self,
+        collection: str,
+        filter: dict | None = None,
+        sort: list[tuple[str, str]] | None = None,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> AsyncIterator[dict]:
+        """Stream entities matching a query as rows are fetched."""
+        plan = self._ensure_collection(collection)
+        select = self._build_select(plan, filter, sort, limit, offset)
+        if select is None:
+            return
+
+        rows = None
+        async with self._reader() as conn:
+            cursor = await conn.execute(*select)
+            try:
+                if conn is self._conn and self._txn_owner is None:
+                    # Reading through the writer under the write lock: fetch
+                    # it all now rather than hold the lock while the caller
+                    # iterates (and perhaps writes)
+                    rows = await cursor.fetchall()
+                else:
+                    cursor.arraysize = _FETCH_SIZE
+                    async for row in cursor:
+                        yield plan.row_to_entity(row)
+            finally:
+                await cursor.close()
+
+        if rows is not None:
+            for row in rows:
+                yield plan.row_to_entity(row)
+
+    def _build_select(
+        self,
+        plan: _SchemaPlan,
+        filter: dict | None,
+        sort: list[tuple[str, str]] | None,
+        limit: int | None,
+        offset: int,
+    ) -> tuple[str, list[Any]] | None:
+        """Build the SELECT statement and its parameters for a query.
+
+        Returns None if the filter cannot match any entity.
         """
-        values.extend([limit, offset])
+        collection = plan.schema.name
+        conditions, values = self._build_conditions(filter, plan)
 
-        cursor = await self.conn.execute(query, values)
-        rows = await cursor.fetchall()
+        order: list[tuple[str, str]] = []
+        for field, direction in sort or ():
+            if field not in plan.filter_fields:
+                raise SchemaError(f"Cannot sort '{collection}' by unknown field '{field}'")
+            order.append((field, "DESC" if direction.lower() == "desc" else "ASC"))
 
-        return [self._row_to_entity(row, schema) for row in rows]
+        if _NEVER in conditions:
+            return None
 
-    def _build_filter_condition(self, key: str, value: Any) -> tuple[str, list[Any]]:
-        """Build SQL condition from filter key/value."""
-        # Parse operator from key
-        if "__" in key:
-            field, op = key.rsplit("__", 1)
-        else:
-            field = key
-            op = "eq"
-
-        if op == "eq":
-            return f"{field} = ?", [value]
-        elif op == "ne":
-            return f"{field} != ?", [value]
-        elif op == "gt":
-            return f"{field} > ?", [value]
-        elif op == "gte":
-            return f"{field} >= ?", [value]
-        elif op == "lt":
-            return f"{field} < ?", [value]
-        elif op == "lte":
-            return f"{field} <= ?", [value]
-        elif op == "in":
-            placeholders = ", ".join("?" * len(value))
-            return f"{field} IN ({placeholders})", list(value)
-        elif op == "not_in":
-            placeholders = ", ".join("?" * len(value))
-            return f"{field} NOT IN ({placeholders})", list(value)
-        elif op == "contains":
-            return f"{field} LIKE ?", [f"%{value}%"]
-        elif op == "starts_with":
-            return f"{field} LIKE ?", [f"{value}%"]
-        elif op == "ends_with":
-            return f"{field} LIKE ?", [f"%{value}"]
-        elif op == "is_null":
-            if value:
-                return f"{field} IS NULL", []
-            else:
-                return f"{field} IS NOT NULL", []
-        else:
-            # Default to equality
-            return f"{key} = ?", [value]
+        # SQLite treats a negative LIMIT as "no limit"
+        values.extend([-1 if limit is None else limit, offset])
+        return _select_sql(collection, conditions, tuple(order)), values
 
-    async def count(self, collection: str, filter: dict | None = None) -> int:
-        """Count entities matching filter."""
-        self._ensure_collection(collection)
+    def _build_where(self, filter: dict | None, plan: _SchemaPlan) -> tuple[str, list[Any]]:
+        """Build the WHERE clause (excluding deleted rows) for a filter."""
+        conditions, values = self._build_conditions(filter, plan)
+        return _where_sql(conditions), values
 
-        conditions = ["_deleted = 0"]
+    def _build_conditions(
+        self,
+        filter: dict | None,
+        plan: _SchemaPlan,
+    ) -> tuple[tuple[str, ...], list[Any]]:
+        """Build the SQL conditions of a filter and their parameters."""
+        if not filter:
+            return (), []
+
+        conditions = []
         values: list[Any] = []
+        for key, value in filter.items():
+            condition, vals = self._build_filter_condition(key, value, plan)
+            conditions.append(condition)
+            values.extend(vals)
+        return tuple(conditions), values
 
-        if filter:
-            for key, value in filter.items():
-                condition, vals = self._build_filter_condition(key, value)
-                conditions.append(condition)
-                values.extend(vals)
+    def _build_filter_condition(
+        self,
+        key: str,
+        value: Any,
+        plan: _SchemaPlan,
+    ) -> tuple[str, list[Any]]:
+        """Build SQL condition from filter key/value.
+
+        Every accepted key was compiled when the collection was registered;
+        anything else names an unknown field or operator.
+        """
+        condition = plan.filters.get(key)
+        if condition is not None:
+            return condition(value)
 
-        where_clause = " AND ".join(conditions)
+        field, _, op = key.rpartition("__")
+        if field not in plan.filter_fields:
+            raise SchemaError(f"Cannot filter on unknown field '{key}'")
+        raise SchemaError(f"Unknown filter operator '{op}' in '{key}'")
 
-        cursor = await self.conn.execute(
-            f"SELECT COUNT(*) FROM {collection} WHERE {where_clause}",
-            values,
-        )
-        row = await cursor.fetchone()
+    async def count(
+        self,
+        collection: str,
+        filter: dict | None = None,
+        exact: bool = False,
+    ) -> int:
+        """Count entities matching filter."""
+        plan = self._ensure_collection(collection)
+        conditions, values = self._build_conditions(filter, plan)
+        if _NEVER in conditions:
+            return 0
+
+        async with self._reader() as conn:
+            if not filter and not exact:
+                # Maintained by triggers, so no table scan is needed
+                cursor = await conn.execute(
+                    "SELECT n FROM _counts WHERE collection = ?", (collection,)
+                )
+                row = await cursor.fetchone()
+                if row is not None:
+                    return row[0]
+
+            cursor = await conn.execute(_count_sql(collection, conditions), values)
+            row = await cursor.fetchone()
         return row[0] if row else 0
 
     # === Semantic Search ===
@@ -469,7 +1896,7 @@ class SQLiteLocalFirstStorage:
     @property
     def has_vector_search(self) -> bool:
         """Whether vector search is available."""
-        return self._config is not None and self._config.enable_vectors
+        return self._vectors_loaded
 
     async def semantic_search(
         self,
@@ -478,20 +1905,105 @@ class SQLiteLocalFirstStorage:
         limit: int = 10,
         filter: dict | None = None,
     ) -> list[dict]:
-        """Find semantically similar entities."""
+        """Find semantically similar entities.
+
+        The `limit` nearest entities are found through the sqlite-vec index
+        and returned closest first. With a filter, a larger set of nearest
+        candidates is fetched and then filtered, so fewer than `limit`
+        entities may come back when the filter is very selective.
+        """
         if not self.has_vector_search:
+            if self._config is not None and self._config.enable_vectors:
+                raise NotSupportedError(
+                    "Vector search needs the sqlite-vec extension. "
+                    "Install the 'vectors' extra."
+                )
             raise NotSupportedError("Vector search not enabled. Set enable_vectors=True in config.")
 
-        schema = self._ensure_collection(collection)
-        if not schema.vector_field:
+        plan = self._ensure_collection(collection)
+        if not plan.schema.vector_field:
             raise SchemaError(f"Collection '{collection}' has no vector_field defined")
 
-        # Note: Full vector search requires sqlite-vec extension
-        # For now, fall back to text search
-        raise NotSupportedError(
-            "Vector search requires sqlite-vec extension. "
-            "Use query() with contains filter as an alternative."
-        )
+        where_clause, values = self._build_where(filter, plan)
+        await self._embed_missing(plan.schema)
+        (embedding,) = await self._embed([query])
+        candidates = limit * _FILTERED_KNN_FACTOR if filter else limit
+
+        async with self._reader() as conn:
+            cursor = await conn.execute(
+                f"""
+                WITH nearest AS (
+                    SELECT rowid AS _rowid, distance AS _distance FROM vec_{collection}
+                    WHERE embedding MATCH vec_int8(?) AND k = ?
+                )
+                SELECT {collection}.*, nearest._distance
+                FROM nearest JOIN {collection} ON {collection}.rowid = nearest._rowid
+                WHERE {where_clause}
+                ORDER BY nearest._distance
+                LIMIT ?
+                """,
+                (embedding, candidates, *values, limit),
+            )
+            rows = await cursor.fetchall()
+
+        results = []
+        for row in rows:
+            entity = plan.row_to_entity(row)
+            entity["_distance"] = row[-1] / _INT8_SCALE
+            results.append(entity)
+        return results
+
+    async def _embed_missing(self, schema: Schema) -> None:
+        """Embed the live entities of a collection that have no embedding yet.
+
+        Runs inside a write transaction so an entity cannot change between
+        reading its text and storing its embedding.
+        """
+        name = schema.name
+        field = schema.vector_field
+        async with self._write_scope():
+            cursor = await self.conn.execute(f"""
+                SELECT rowid, {field} FROM {name}
+                WHERE _deleted = 0 AND {field} IS NOT NULL
+                AND rowid NOT IN (SELECT rowid FROM vec_{name})
+            """)
+            rows = await cursor.fetchall()
+            for start in range(0, len(rows), _BATCH_SIZE):
+                chunk = rows[start:start + _BATCH_SIZE]
+                embeddings = await self._embed([str(text) for _, text in chunk])
+                await self.conn.executemany(
+                    f"INSERT INTO vec_{name} (rowid, embedding) VALUES (?, vec_int8(?))",
+                    [(rowid, embedding) for (rowid, _), embedding in zip(chunk, embeddings)],
+                )
+
+    async def _embedding_model(self) -> Any:
+        """Load the configured sentence-transformers model once."""
+        if self._embedder is None:
+            try:
+                from sentence_transformers import SentenceTransformer
+            except ImportError as e:
+                raise NotSupportedError(
+                    "Vector search needs sentence-transformers. Install the 'vectors' extra."
+                ) from e
+            assert self._config is not None
+            self._embedder = await asyncio.to_thread(
+                SentenceTransformer, self._config.embedding_model
+            )
+        return self._embedder
+
+    async def _embed(self, texts: list[str]) -> list[bytes]:
+        """Embed texts as int8 blobs, off the event loop.
+
+        Embeddings are normalized, so sqlite-vec's L2 distance ranks
+        results the same as cosine similarity, and every component fits
+        the fixed int8 scale.
+        """
+        model = await self._embedding_model()
+        vectors = await asyncio.to_thread(model.encode, texts, normalize_embeddings=True)
+        return [
+            (vector * _INT8_SCALE).round().clip(-_INT8_SCALE, _INT8_SCALE).astype("int8").tobytes()
+            for vector in vectors
+        ]
 
     # === Sync Operations ===
 
@@ -506,30 +2018,31 @@ class SQLiteLocalFirstStorage:
         entity_id: str,
         operation: str,
         data: dict,
+        timestamp: int,
     ) -> None:
-        """Track a change for sync."""
+        """Track a change for sync (within the caller's transaction).
+
+        `timestamp` is in epoch microseconds, from the same `_now()` call as
+        the entity's `_updated_at`.
+        """
         if not self.supports_sync:
             return
 
-        now = datetime.now(timezone.utc).isoformat()
         await self.conn.execute(
             """
             INSERT INTO _pending_changes (collection, entity_id, operation, data, timestamp)
             VALUES (?, ?, ?, ?, ?)
             """,
-            (collection, entity_id, operation, json.dumps(data), now),
+            (collection, entity_id, operation, _json.dumps(data), timestamp),
         )
-        await self.conn.commit()
 
     async def sync(self) -> SyncResult:
         """Sync with backend."""
         if not self.supports_sync:
             raise NotSupportedError("Sync not available. Configure backend_url.")
 
-        # Get pending changes
-        changes = await self.get_pending_changes()
-
-        # TODO: Implement actual sync protocol
+        # TODO: Implement actual sync protocol: push each page from
+        # iter_pending_changes() and ack_changes() what the backend accepted
         # For now, return empty result
         return SyncResult(
             pushed=0,
@@ -538,30 +2051,113 @@ class SQLiteLocalFirstStorage:
             errors=["Sync not yet implemented"],
         )
 
-    async def get_pending_changes(self) -> list[Change]:
-        """Get changes not yet synced."""
+    async def get_pending_changes(
+        self,
+        after: Change | None = None,
+        limit: int | None = None,
+    ) -> list[Change]:
+        """Get changes not yet synced, oldest first.
+
+        Pass the last change of one page as `after` to get the next page;
+        `limit` caps the page size.
+        """
         if not self.supports_sync:
             raise NotSupportedError("Sync not available. Configure backend_url.")
 
-        cursor = await self.conn.execute(
-            "SELECT * FROM _pending_changes ORDER BY timestamp"
-        )
-        rows = await cursor.fetchall()
+        # Keyset on id, which follows commit order. Not on timestamp: it is
+        # taken before a write waits for the connection, so a change can
+        # commit after a page was read yet carry an earlier timestamp.
+        position = 0 if after is None else after.id or 0
+        async with self._reader() as conn:
+            cursor = await conn.execute(
+                "SELECT id, collection, entity_id, operation, data, timestamp "
+                "FROM _pending_changes WHERE id > ? ORDER BY id LIMIT ?",
+                (position, -1 if limit is None else limit),
+            )
+            rows = await cursor.fetchall()
 
         changes = []
-        for row in rows:
+        for change_id, collection, entity_id, operation, data, timestamp in rows:
             changes.append(
                 Change(
-                    collection=row["collection"],
-                    entity_id=row["entity_id"],
-                    operation=row["operation"],
-                    data=json.loads(row["data"]) if row["data"] else {},
-                    timestamp=datetime.fromisoformat(row["timestamp"]),
+                    collection=collection,
+                    entity_id=entity_id,
+                    operation=operation,
+                    data=_json.loads(data) if data else {},
+                    timestamp=_EPOCH + timedelta(microseconds=timestamp),
+                    id=change_id,
                 )
             )
 
         return changes
 
+    async def iter_pending_changes(
+        self,
+        after: Change | None = None,
+        chunk_size: int = 1000,
+    ) -> AsyncIterator[Change]:
+        """Stream changes not yet synced, oldest first.
+
+        Changes are fetched `chunk_size` at a time with the same keyset
+        paging as `get_pending_changes`, so memory stays bounded however
+        long the queue is.
+        """
+        while page := await self.get_pending_changes(after=after, limit=chunk_size):
+            for change in page:
+                yield change
+            after = page[-1]
+
+    async def ack_changes(self, change_ids: Iterable[int]) -> None:
+        """Remove synced changes from the change log in a single transaction."""
+        if not self.supports_sync:
+            raise NotSupportedError("Sync not available. Configure backend_url.")
+
+        async with self._write_scope():
+            await self.conn.executemany(
+                "DELETE FROM _pending_changes WHERE id = ?",
+                ((change_id,) for change_id in change_ids),
+            )
+
+    async def apply_changes(self, changes: Sequence[Change]) -> None:
+        """Apply backend changes locally in a single transaction."""
+        # Batch runs of consecutive changes that share a statement; keeping
+        # runs (rather than grouping globally) preserves the change order
+        batches: list[tuple[str, list[tuple[Any, ...]]]] = []
+        last_key: tuple[Any, ...] | None = None
+
+        for change in changes:
+            plan = self._ensure_collection(change.collection)
+            schema = plan.schema
+            timestamp = change.timestamp.isoformat()
+
+            if change.operation == "delete":
+                key: tuple[Any, ...] = (change.collection, "delete")
+                sql = (
+                    f"UPDATE {change.collection} SET _deleted = 1, _updated_at = ? "
+                    f"WHERE {schema.primary_key} = ?"
+                )
+                row: tuple[Any, ...] = (timestamp, change.entity_id)
+            else:
+                entity = {**change.data, schema.primary_key: change.entity_id}
+                columns = tuple(name for name in schema.fields if name in entity)
+                key = (change.collection, "upsert", columns)
+                sql = self._upsert_sql(plan, columns)
+                row = tuple(
+                    plan.serializers.get(schema.fields[name], _identity)(entity[name])
+                    for name in columns
+                ) + (timestamp, timestamp)
+
+            if key != last_key:
+                batches.append((sql, []))
+                last_key = key
+            batches[-1][1].append(row)
+
+        async with self._write_scope():
+            for name in {change.collection for change in changes}:
+                self._evict_rows(name)
+            for sql, rows in batches:
+                await self.conn.executemany(sql, rows)
+
     async def force_push(self, collection: str, entity_id: str) -> None:
         """Force push a specific entity."""
         if not self.supports_sync:
@@ -581,3 +2177,52 @@ class SQLiteLocalFirstStorage:
 
         # TODO: Implement actual sync protocol
         raise NotSupportedError("Force pull not yet implemented")
+
+
+class SQLiteCollection:
+    """Handle bound to one collection of a SQLiteLocalFirstStorage.
+
+    Returned by `SQLiteLocalFirstStorage.collection()`. The collection is
+    resolved once when the handle is created, so calls made through the
+    handle skip the per-call registration check. Get a new handle after
+    re-registering the collection.
+    """
+
+    __slots__ = ("_plan", "_storage", "name")
+
+    def __init__(self, storage: SQLiteLocalFirstStorage, plan: _SchemaPlan):
+        self._storage = storage
+        self._plan = plan
+        self.name = plan.schema.name
+
+    async def save(self, entity: dict) -> str:
+        """Save an entity (create or update)."""
+        return await self._storage._save(self._plan, entity)
+
+    async def get(self, entity_id: str) -> dict | None:
+        """Get an entity by ID."""
+        return await self._storage._get(self._plan, entity_id)
+
+    async def update(self, entity_id: str, changes: dict) -> dict:
+        """Partial update of an entity."""
+        return await self._storage._update(self._plan, entity_id, changes)
+
+    async def delete(self, entity_id: str) -> bool:
+        """Delete an entity (soft delete)."""
+        return await self._storage._delete(self._plan, entity_id)
+
+    async def query(
+        self,
+        filter: dict | None = None,
+        sort: list[tuple[str, str]] | None = None,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> list[dict]:
+        """Query entities with filtering, sorting, pagination."""
+        return await self._storage.query(
+            self.name, filter=filter, sort=sort, limit=limit, offset=offset
+        )
+
+    async def count(self, filter: dict | None = None, exact: bool = False) -> int:
+        """Count entities matching filter."""
+        return await self._storage.count(self.name, filter=filter, exact=exact)
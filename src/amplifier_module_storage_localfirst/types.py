@@ -7,6 +7,11 @@ from datetime import datetime
 from enum import Enum
 from typing import Any
 
+# An entity as passed to and returned from storage: field name -> value.
+# Values are plain Python types (str, int, float, bool, datetime, list, dict);
+# JSON fields are serialized by the backend.
+Entity = dict[str, Any]
+
 
 class FieldType(Enum):
     """Supported field types for schema definitions."""
@@ -28,14 +33,16 @@ class Schema:
         name: Collection name.
         fields: Dict mapping field names to their types.
         primary_key: Field to use as primary key (default: "id").
-        indexes: Fields to create indexes on for faster queries.
+        indexes: Fields to create indexes on for faster queries. A tuple
+            of fields creates one composite index, e.g. ("status",
+            "priority") for filtering on status and sorting by priority.
         vector_field: Field to embed for semantic search (if enabled).
     """
 
     name: str
     fields: dict[str, FieldType]
     primary_key: str = "id"
-    indexes: list[str] | None = None
+    indexes: list[str | tuple[str, ...]] | None = None
     vector_field: str | None = None
 
 
@@ -44,7 +51,8 @@ class StorageConfig:
     """Configuration for a LocalFirstStorage instance.
 
     Attributes:
-        db_path: Path to the local database file.
+        db_path: Path to the local database file, or an SQLite URI
+            filename if `uri` is set.
         backend_url: Optional URL for backend sync. None = local only.
         auth_token: Optional auth token for backend API.
         conflict_strategy: How to handle sync conflicts:
@@ -55,6 +63,33 @@ class StorageConfig:
         sync_interval: Seconds between background sync attempts.
         enable_vectors: Enable semantic search via embeddings.
         embedding_model: Model for generating embeddings.
+        journal_mode: SQLite journal mode ("WAL", "DELETE", "MEMORY").
+            WAL lets readers proceed during writes and needs fewer fsyncs.
+        synchronous: SQLite sync level ("OFF", "NORMAL", "FULL").
+            NORMAL is durable in WAL mode except on power loss.
+        cache_size_kb: Page cache size per connection, in KiB.
+        mmap_size_bytes: Bytes of the database to memory-map (0 = disabled).
+        temp_store: Where temp tables and indices live
+            ("DEFAULT", "FILE", "MEMORY").
+        reader_pool_size: Extra read-only connections used for reads
+            outside a transaction, so they run alongside writes. Only
+            used in WAL mode (0 = read through the writer connection).
+        driver: SQLite driver ("aiosqlite", or "apsw" with the `apsw`
+            extra installed, which has less per-call overhead).
+        uri: Open `db_path` as an SQLite URI, e.g.
+            "file:name?mode=memory&cache=shared" for a shared in-memory
+            database.
+        row_cache_size: Rows kept in memory per collection for `get()`,
+            least recently used dropped first (0 = no cache). Cached rows
+            are dropped on every write through this storage, so use 0 if
+            other processes or connections write the database.
+        analyze_every: Writes between refreshes of the query planner's
+            statistics (`PRAGMA optimize`, also run on close; 0 = only
+            on close).
+        json_encoding: How JSON fields are stored: "json" (text) or
+            "msgpack" (compact BLOBs; needs the `speedups` extra, and
+            text filters such as `__contains` then match encoded bytes).
+            Fixed when the database is created.
     """
 
     db_path: str
@@ -65,6 +100,17 @@ class StorageConfig:
     sync_interval: int = 60
     enable_vectors: bool = False
     embedding_model: str = "all-MiniLM-L6-v2"
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"
+    cache_size_kb: int = 65536
+    mmap_size_bytes: int = 268435456
+    temp_store: str = "MEMORY"
+    reader_pool_size: int = 2
+    driver: str = "aiosqlite"
+    uri: bool = False
+    row_cache_size: int = 1024
+    analyze_every: int = 1000
+    json_encoding: str = "json"
 
 
 @dataclass
@@ -117,6 +163,8 @@ class Change:
         operation: Type of operation ("create", "update", "delete").
         data: Entity data (for create/update).
         timestamp: When the change occurred.
+        id: Position in the local pending-change queue (None for
+            changes that did not come from it).
     """
 
     collection: str
@@ -124,3 +172,4 @@ class Change:
     operation: str  # "create", "update", "delete"
     data: dict[str, Any]
     timestamp: datetime
+    id: int | None = None
@@ -1,11 +1,16 @@
 """Tests for LocalFirstStorage module."""
 
+import asyncio
 import pytest
+import pytest_asyncio
 import tempfile
 import os
+import uuid
+from dataclasses import replace
 from datetime import datetime, timezone
 
 from amplifier_module_storage_localfirst import (
+    Change,
     SQLiteLocalFirstStorage,
     StorageConfig,
     Schema,
@@ -13,25 +18,45 @@ from amplifier_module_storage_localfirst import (
     NotFoundError,
     SchemaError,
     NotSupportedError,
+    StorageError,
 )
+from amplifier_module_storage_localfirst.sqlite import _select_sql
+
+# Tests share the module's event loop, and with it the `storage` instance
+pytestmark = pytest.mark.asyncio(loop_scope="module")
+
+NOW = datetime.now(timezone.utc)
 
 
 @pytest.fixture
 def storage_config():
-    """Create a temporary storage config."""
+    """Create a storage config for a fresh in-memory database.
+
+    The database lives as long as a connection to it is open.
+    """
+    return StorageConfig(
+        db_path=f"file:test_{uuid.uuid4().hex}?mode=memory&cache=shared",
+        uri=True,
+    )
+
+
+@pytest.fixture
+def storage_config_ondisk():
+    """Create a storage config for a temporary database file."""
     with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as f:
         db_path = f.name
 
     yield StorageConfig(db_path=db_path)
 
-    # Cleanup
-    try:
-        os.unlink(db_path)
-    except OSError:
-        pass
+    # Cleanup, including the WAL-mode side files
+    for path in (db_path, f"{db_path}-wal", f"{db_path}-shm"):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def todo_schema():
     """Create a todo schema for testing."""
     return Schema(
@@ -51,26 +76,117 @@ def todo_schema():
     )
 
 
-@pytest.fixture
-async def storage(storage_config, todo_schema):
-    """Create and initialize storage with todo schema."""
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def shared_storage(todo_schema):
+    """Storage with the todo schema, opened once for the module."""
     store = SQLiteLocalFirstStorage()
-    await store.initialize(storage_config)
+    await store.initialize(StorageConfig(
+        db_path=f"file:shared_{uuid.uuid4().hex}?mode=memory&cache=shared",
+        uri=True,
+    ))
     await store.register_collection(todo_schema)
     yield store
     await store.close()
 
 
+@pytest_asyncio.fixture(loop_scope="module")
+async def storage(shared_storage):
+    """The shared storage, emptied again after each test."""
+    yield shared_storage
+    await shared_storage.truncate("todos")
+
+
 class TestStorageInitialization:
     """Tests for storage initialization and configuration."""
 
-    async def test_initialize_creates_database(self, storage_config):
+    async def test_initialize_creates_database(self, storage_config_ondisk):
         store = SQLiteLocalFirstStorage()
-        await store.initialize(storage_config)
+        await store.initialize(storage_config_ondisk)
+
+        assert os.path.exists(storage_config_ondisk.db_path)
+        await store.close()
+
+    async def test_initialize_applies_pragmas(self, storage_config_ondisk):
+        store = SQLiteLocalFirstStorage()
+        await store.initialize(storage_config_ondisk)
+
+        cursor = await store.conn.execute("PRAGMA journal_mode")
+        assert (await cursor.fetchone())[0] == "wal"
+        cursor = await store.conn.execute("PRAGMA synchronous")
+        assert (await cursor.fetchone())[0] == 1  # NORMAL
+        cursor = await store.conn.execute("PRAGMA temp_store")
+        assert (await cursor.fetchone())[0] == 2  # MEMORY
+        cursor = await store.conn.execute("PRAGMA cache_size")
+        assert (await cursor.fetchone())[0] == -65536
+        cursor = await store.conn.execute("PRAGMA busy_timeout")
+        assert (await cursor.fetchone())[0] == 5000
+
+        await store.close()
+
+    async def test_initialize_applies_pragma_overrides(self, storage_config_ondisk):
+        config = replace(
+            storage_config_ondisk,
+            journal_mode="delete",
+            synchronous="FULL",
+            cache_size_kb=2048,
+            mmap_size_bytes=0,
+        )
+        store = SQLiteLocalFirstStorage()
+        await store.initialize(config)
+
+        cursor = await store.conn.execute("PRAGMA journal_mode")
+        assert (await cursor.fetchone())[0] == "delete"
+        cursor = await store.conn.execute("PRAGMA synchronous")
+        assert (await cursor.fetchone())[0] == 2  # FULL
+        cursor = await store.conn.execute("PRAGMA cache_size")
+        assert (await cursor.fetchone())[0] == -2048
+        cursor = await store.conn.execute("PRAGMA mmap_size")
+        assert (await cursor.fetchone())[0] == 0
+
+        await store.close()
+
+    async def test_initialize_rejects_invalid_pragma(self, storage_config):
+        config = replace(storage_config, journal_mode="BOGUS")
+        store = SQLiteLocalFirstStorage()
+
+        with pytest.raises(StorageError, match="Invalid journal_mode"):
+            await store.initialize(config)
 
-        assert os.path.exists(storage_config.db_path)
         await store.close()
 
+    async def test_initialize_rejects_old_sqlite(self, storage_config, monkeypatch):
+        monkeypatch.setattr(
+            "amplifier_module_storage_localfirst.sqlite._MIN_SQLITE_VERSION", (99, 0, 0)
+        )
+        store = SQLiteLocalFirstStorage()
+
+        with pytest.raises(StorageError, match="SQLite 99.0.0 or newer"):
+            await store.initialize(storage_config)
+
+    async def test_initialize_rejects_unknown_driver(self, storage_config):
+        config = replace(storage_config, driver="bogus")
+        store = SQLiteLocalFirstStorage()
+
+        with pytest.raises(StorageError, match="Invalid driver"):
+            await store.initialize(config)
+
+    async def test_apsw_driver(self, storage_config, todo_schema):
+        pytest.importorskip("apsw")
+        config = replace(storage_config, driver="apsw")
+        store = SQLiteLocalFirstStorage()
+        await store.initialize(config)
+        try:
+            await store.register_collection(todo_schema)
+            ids = await store.save_many("todos", [{"text": "A"}, {"text": "B"}])
+            await store.update("todos", ids[0], {"status": "done"})
+
+            assert (await store.get("todos", ids[0]))["status"] == "done"
+            assert [t["text"] async for t in store.query_iter("todos", sort=[("text", "asc")])] \
+                == ["A", "B"]
+            assert await store.delete_many("todos", ids) == 2
+        finally:
+            await store.close()
+
     async def test_register_collection(self, storage_config, todo_schema):
         store = SQLiteLocalFirstStorage()
         await store.initialize(storage_config)
@@ -82,6 +198,72 @@ class TestStorageInitialization:
 
         await store.close()
 
+    async def test_filtered_query_uses_partial_index(self, storage):
+        where, values = storage._build_where(
+            {"status": "pending"}, storage._ensure_collection("todos")
+        )
+        cursor = await storage.conn.execute(
+            f"EXPLAIN QUERY PLAN SELECT * FROM todos WHERE {where}", values
+        )
+        plan = " ".join(row[-1] for row in await cursor.fetchall())
+
+        assert where == "status = ? AND _deleted = 0"
+        assert "USING INDEX idx_todos_status_live" in plan
+
+    async def test_composite_index_serves_filter_and_sort(self, storage_config):
+        store = SQLiteLocalFirstStorage()
+        await store.initialize(storage_config)
+        await store.register_collection(Schema(
+            name="tasks",
+            fields={"id": FieldType.STRING, "status": FieldType.STRING,
+                    "priority": FieldType.INTEGER},
+            indexes=[("status", "priority")],
+        ))
+
+        query, values = store._build_select(
+            store._ensure_collection("tasks"), {"status": "pending"},
+            [("priority", "asc")], 10, 0,
+        )
+        cursor = await store.conn.execute(f"EXPLAIN QUERY PLAN {query}", values)
+        plan = " ".join(row[-1] for row in await cursor.fetchall())
+
+        assert "USING INDEX idx_tasks_status_priority_live" in plan
+        assert "TEMP B-TREE" not in plan  # No separate sort
+        with pytest.raises(SchemaError, match="Index field 'bogus'"):
+            await store.register_collection(Schema(
+                name="tasks", fields={"id": FieldType.STRING}, indexes=[("id", "bogus")]
+            ))
+        await store.close()
+
+    async def test_register_replaces_full_indexes(self, storage_config_ondisk, todo_schema):
+        import sqlite3
+
+        store = SQLiteLocalFirstStorage()
+        await store.initialize(storage_config_ondisk)
+        await store.register_collection(todo_schema)
+        await store.close()
+
+        # As created by earlier versions
+        db = sqlite3.connect(storage_config_ondisk.db_path)
+        db.execute("DROP INDEX idx_todos_status_live")
+        db.execute("CREATE INDEX idx_todos_status ON todos(status)")
+        db.commit()
+        db.close()
+
+        store = SQLiteLocalFirstStorage()
+        await store.initialize(storage_config_ondisk)
+        try:
+            await store.register_collection(todo_schema)
+            cursor = await store.conn.execute(
+                "SELECT name FROM sqlite_master "
+                "WHERE type = 'index' AND name LIKE 'idx_todos_status%'"
+            )
+            names = [row[0] for row in await cursor.fetchall()]
+        finally:
+            await store.close()
+
+        assert names == ["idx_todos_status_live"]
+
     async def test_register_invalid_schema_no_name(self, storage_config):
         store = SQLiteLocalFirstStorage()
         await store.initialize(storage_config)
@@ -139,6 +321,16 @@ class TestCRUDOperations:
         assert entity_id is not None
         assert len(entity_id) > 0
 
+    async def test_generated_ids_are_time_ordered(self, storage):
+        import uuid
+
+        first = await storage.save("todos", {"text": "First"})
+        await asyncio.sleep(0.002)
+        second = await storage.save("todos", {"text": "Second"})
+
+        assert uuid.UUID(first).version == 7
+        assert first < second
+
     async def test_save_with_explicit_id(self, storage):
         entity_id = await storage.save("todos", {
             "id": "my-custom-id",
@@ -193,6 +385,76 @@ class TestCRUDOperations:
         assert updated["text"] == "Buy groceries"  # Unchanged
         assert updated["priority"] == 1  # Unchanged
 
+    async def test_get_after_save_is_served_from_row_cache(self, storage):
+        entity_id = await storage.save("todos", {"text": "Cached", "tags": ["a"]})
+        statements = []
+        await storage.conn.set_trace_callback(statements.append)
+        try:
+            first = await storage.get("todos", entity_id)
+            first["tags"].append("b")
+            second = await storage.get("todos", entity_id)
+        finally:
+            await storage.conn.set_trace_callback(None)
+
+        assert statements == []
+        assert second["text"] == "Cached"
+        assert second["tags"] == ["a"]  # Each get decodes a fresh entity
+
+    async def test_row_cache_drops_rolled_back_writes(self, storage):
+        entity_id = await storage.save("todos", {"text": "Original"})
+        await storage.get("todos", entity_id)
+
+        with pytest.raises(RuntimeError):
+            async with storage.transaction():
+                await storage.update("todos", entity_id, {"text": "Changed"})
+                assert (await storage.get("todos", entity_id))["text"] == "Changed"
+                raise RuntimeError("abort")
+
+        assert (await storage.get("todos", entity_id))["text"] == "Original"
+        await storage.delete("todos", entity_id)
+        assert await storage.get("todos", entity_id) is None
+
+    async def test_row_cache_disabled(self, storage_config, todo_schema):
+        store = SQLiteLocalFirstStorage()
+        await store.initialize(replace(storage_config, row_cache_size=0))
+        await store.register_collection(todo_schema)
+        entity_id = await store.save("todos", {"text": "Todo"})
+
+        await store.get("todos", entity_id)
+
+        assert store._row_cache == {}
+        await store.close()
+
+    @pytest.mark.parametrize("has_returning", [True, False])
+    async def test_update_tracks_updated_entity(
+        self, storage_config, todo_schema, monkeypatch, has_returning
+    ):
+        monkeypatch.setattr(
+            "amplifier_module_storage_localfirst.sqlite._HAS_RETURNING", has_returning
+        )
+        config = replace(
+            storage_config,
+            backend_url="https://api.example.com/sync",
+        )
+        store = SQLiteLocalFirstStorage()
+        await store.initialize(config)
+        try:
+            await store.register_collection(todo_schema)
+            entity_id = await store.save("todos", {"text": "Todo", "status": "pending"})
+
+            updated = await store.update("todos", entity_id, {"done": True})
+
+            assert updated["done"] is True
+            assert updated["text"] == "Todo"
+            assert updated["_version"] == 2
+            _, change = await store.get_pending_changes()
+            assert change.operation == "update"
+            assert change.data["done"] is True
+            with pytest.raises(NotFoundError):
+                await store.update("todos", "nonexistent", {"done": True})
+        finally:
+            await store.close()
+
     async def test_update_nonexistent_raises(self, storage):
         with pytest.raises(NotFoundError):
             await storage.update("todos", "nonexistent", {"status": "active"})
@@ -212,6 +474,69 @@ class TestCRUDOperations:
         result = await storage.delete("todos", "nonexistent")
         assert result is False
 
+    async def test_save_restores_deleted_entity(self, storage):
+        entity_id = await storage.save("todos", {"text": "Old", "status": "pending"})
+        await storage.delete("todos", entity_id)
+
+        await storage.save("todos", {"id": entity_id, "text": "New", "status": "pending"})
+
+        entity = await storage.get("todos", entity_id)
+        assert entity["text"] == "New"
+        assert await storage.count("todos") == 1
+
+    async def test_purge_deleted(self, storage):
+        async with storage.transaction():
+            kept = await storage.save("todos", {"text": "Keep", "status": "pending"})
+            gone = await storage.save("todos", {"text": "Gone", "status": "pending"})
+            await storage.delete("todos", gone)
+
+        assert await storage.purge_deleted("todos", before=datetime(2000, 1, 1)) == 0
+        assert await storage.purge_deleted("todos") == 1
+
+        cursor = await storage.conn.execute("SELECT id FROM todos")
+        assert [row[0] for row in await cursor.fetchall()] == [kept]
+        assert await storage.count("todos") == 1
+
+    async def test_purge_keeps_unsynced_deletes(self, storage_config, todo_schema):
+        config = replace(
+            storage_config,
+            backend_url="https://api.example.com/sync",
+        )
+        store = SQLiteLocalFirstStorage()
+        await store.initialize(config)
+        try:
+            await store.register_collection(todo_schema)
+            entity_id = await store.save("todos", {"text": "Todo", "status": "pending"})
+            await store.delete("todos", entity_id)
+
+            assert await store.purge_deleted("todos") == 0
+        finally:
+            await store.close()
+
+    @pytest.mark.parametrize("has_returning", [True, False])
+    async def test_save_tracks_create_then_update(
+        self, storage_config, todo_schema, monkeypatch, has_returning
+    ):
+        # Older SQLite builds (< 3.35) have no RETURNING clause
+        monkeypatch.setattr(
+            "amplifier_module_storage_localfirst.sqlite._HAS_RETURNING", has_returning
+        )
+        config = replace(
+            storage_config,
+            backend_url="https://api.example.com/sync",
+        )
+        store = SQLiteLocalFirstStorage()
+        await store.initialize(config)
+        await store.register_collection(todo_schema)
+
+        entity_id = await store.save("todos", {"text": "Todo", "status": "pending"})
+        await store.save("todos", {"id": entity_id, "status": "active"})
+
+        changes = await store.get_pending_changes()
+        assert [c.operation for c in changes] == ["create", "update"]
+
+        await store.close()
+
     async def test_metadata_fields(self, storage):
         entity_id = await storage.save("todos", {
             "text": "Buy groceries",
@@ -237,75 +562,578 @@ class TestCRUDOperations:
         assert entity["_version"] == 2
 
 
-class TestFieldTypes:
-    """Tests for different field types."""
+class TestIntegerPrimaryKey:
+    """Tests for collections keyed by an INTEGER primary key (the rowid)."""
+
+    @pytest.fixture
+    def event_schema(self):
+        return Schema(
+            name="events",
+            fields={"id": FieldType.INTEGER, "kind": FieldType.STRING},
+        )
 
-    async def test_boolean_field(self, storage):
+    @pytest.mark.parametrize("has_returning", [True, False])
+    async def test_save_assigns_integer_ids(
+        self, storage_config, event_schema, monkeypatch, has_returning
+    ):
+        monkeypatch.setattr(
+            "amplifier_module_storage_localfirst.sqlite._HAS_RETURNING", has_returning
+        )
+        config = replace(storage_config, backend_url="https://api.example.com/sync")
+        store = SQLiteLocalFirstStorage()
+        await store.initialize(config)
+        try:
+            await store.register_collection(event_schema)
+
+            first = await store.save("events", {"kind": "start"})
+            second = await store.save("events", {"kind": "stop"})
+            await store.save("events", {"id": second, "kind": "halt"})
+
+            assert (first, second) == (1, 2)
+            assert (await store.get("events", second))["kind"] == "halt"
+            changes = await store.get_pending_changes()
+            assert [(c.entity_id, c.operation) for c in changes] == [
+                ("1", "create"), ("2", "create"), ("2", "update"),
+            ]
+        finally:
+            await store.close()
+
+    async def test_save_many_continues_from_largest_id(self, storage_config, event_schema):
+        store = SQLiteLocalFirstStorage()
+        await store.initialize(storage_config)
+        try:
+            await store.register_collection(event_schema)
+            await store.save("events", {"id": 5, "kind": "start"})
+
+            ids = await store.save_many("events", [
+                {"kind": "a"}, {"id": 9, "kind": "b"}, {"kind": "c"},
+            ])
+            saved = await store.save_rows("events", ["kind"], [("d",)])
+
+            assert ids == [10, 9, 11]
+            assert saved == 1
+            assert [e["id"] for e in await store.query("events", sort=[("id", "asc")])] \
+                == [5, 9, 10, 11, 12]
+        finally:
+            await store.close()
+
+
+class TestBatchOperations:
+    """Tests for batch save/delete."""
+
+    async def test_save_many_keeps_write_order(self, storage):
+        await storage.save_many("todos", [
+            {"id": "b", "text": "1"},
+            {"id": "a", "text": "x", "status": "s"},
+            {"id": "a", "text": "y"},
+        ])
+
+        entity = await storage.get("todos", "a")
+        assert entity["text"] == "y"
+        assert entity["status"] == "s"
+
+    async def test_save_many_creates_entities(self, storage):
+        ids = await storage.save_many("todos", [
+            {"text": "Todo 1", "status": "pending"},
+            {"id": "explicit", "text": "Todo 2", "status": "active", "priority": 2},
+        ])
+
+        assert len(ids) == 2
+        assert ids[1] == "explicit"
+        assert await storage.count("todos") == 2
+
+        entity = await storage.get("todos", "explicit")
+        assert entity["priority"] == 2
+        assert entity["_version"] == 1
+
+    async def test_save_many_updates_existing(self, storage):
         entity_id = await storage.save("todos", {
-            "text": "Test",
+            "text": "Buy groceries",
             "status": "pending",
-            "done": True,
+            "priority": 1,
         })
 
+        await storage.save_many("todos", [{"id": entity_id, "status": "active"}])
+
         entity = await storage.get("todos", entity_id)
-        assert entity["done"] is True
+        assert entity["status"] == "active"
+        assert entity["text"] == "Buy groceries"  # Unchanged
+        assert entity["_version"] == 2
 
-    async def test_integer_field(self, storage):
-        entity_id = await storage.save("todos", {
-            "text": "Test",
-            "status": "pending",
-            "priority": 5,
+    async def test_save_many_in_chunks(self, storage):
+        ids = await storage.save_many(
+            "todos",
+            [{"text": f"Todo {i}", "status": "pending", "priority": i} for i in range(7)],
+            chunk_size=3,
+        )
+
+        assert len(ids) == 7
+        assert await storage.count("todos", exact=True) == 7
+
+    async def test_save_many_keeps_write_order_across_chunks(self, storage):
+        await storage.save_many(
+            "todos",
+            [
+                {"id": "a", "text": "x", "status": "s"},
+                {"id": "a", "text": "y"},
+                {"id": "b", "text": "1", "status": "s"},
+                {"id": "a", "text": "z", "status": "t"},
+                {"id": "a", "text": "last"},
+            ],
+            chunk_size=2,
+        )
+
+        entity = await storage.get("todos", "a")
+        assert entity["text"] == "last"
+        assert entity["status"] == "t"
+
+    async def test_save_many_empty(self, storage):
+        assert await storage.save_many("todos", []) == []
+
+    async def test_get_many(self, storage):
+        ids = await storage.save_many("todos", [
+            {"text": "Todo 1", "status": "pending"},
+            {"text": "Todo 2", "status": "active"},
+        ])
+
+        found = await storage.get_many("todos", [ids[1], "nonexistent", ids[0]])
+
+        assert list(found) == [ids[1], "nonexistent", ids[0]]
+        assert found[ids[0]]["text"] == "Todo 1"
+        assert found[ids[1]]["status"] == "active"
+        assert found["nonexistent"] is None
+
+    async def test_update_many(self, storage):
+        ids = await storage.save_many("todos", [
+            {"text": "Todo 1", "status": "pending", "priority": 1},
+            {"text": "Todo 2", "status": "pending", "priority": 2},
+        ])
+
+        await storage.update_many("todos", {
+            ids[0]: {"status": "active"},
+            ids[1]: {"priority": 5},
         })
 
-        entity = await storage.get("todos", entity_id)
-        assert entity["priority"] == 5
-        assert isinstance(entity["priority"], int)
+        found = await storage.get_many("todos", ids)
+        assert found[ids[0]]["status"] == "active"
+        assert found[ids[0]]["priority"] == 1  # Unchanged
+        assert found[ids[1]]["priority"] == 5
+        assert found[ids[1]]["_version"] == 2
+
+    async def test_update_many_nonexistent_raises(self, storage):
+        entity_id = await storage.save("todos", {"text": "Todo", "status": "pending"})
+
+        with pytest.raises(NotFoundError):
+            await storage.update_many("todos", {
+                entity_id: {"status": "active"},
+                "nonexistent": {"status": "active"},
+            })
+
+        # Nothing was applied
+        assert (await storage.get("todos", entity_id))["status"] == "pending"
+
+    @pytest.mark.parametrize("has_returning", [True, False])
+    async def test_delete_many(self, storage, monkeypatch, has_returning):
+        monkeypatch.setattr(
+            "amplifier_module_storage_localfirst.sqlite._HAS_RETURNING", has_returning
+        )
+        ids = await storage.save_many("todos", [
+            {"text": "Todo 1", "status": "pending"},
+            {"text": "Todo 2", "status": "pending"},
+            {"text": "Todo 3", "status": "pending"},
+        ])
+
+        deleted = await storage.delete_many("todos", [ids[0], ids[1], "nonexistent", ids[0]])
+
+        assert deleted == 2
+        assert await storage.count("todos") == 1
+        assert await storage.get("todos", ids[0]) is None
+        assert await storage.delete_many("todos", [ids[0]]) == 0
+
+    async def test_truncate(self, storage):
+        ids = await storage.save_many("todos", [{"text": "A"}, {"text": "B"}])
+
+        await storage.truncate("todos")
+
+        assert await storage.count("todos") == 0
+        assert await storage.get_many("todos", ids) == dict.fromkeys(ids)
+
+    async def test_save_rows(self, storage):
+        rows = ((f"Todo {i}", "pending", i) for i in range(3))
+
+        saved = await storage.save_rows("todos", ["text", "status", "priority"], rows)
+
+        assert saved == 3
+        results = await storage.query("todos", sort=[("priority", "asc")])
+        assert [r["text"] for r in results] == ["Todo 0", "Todo 1", "Todo 2"]
+        assert all(r["id"] for r in results)
+
+    async def test_save_rows_with_sync_in_chunks(self, storage_config, todo_schema, monkeypatch):
+        monkeypatch.setattr("amplifier_module_storage_localfirst.sqlite._BATCH_SIZE", 2)
+        config = replace(
+            storage_config,
+            backend_url="https://api.example.com/sync",
+        )
+        store = SQLiteLocalFirstStorage()
+        await store.initialize(config)
+        await store.register_collection(todo_schema)
+
+        rows = ((f"Todo {i}", "pending") for i in range(5))
+        saved = await store.save_rows("todos", ["text", "status"], rows)
+
+        assert saved == 5
+        assert len(await store.get_pending_changes()) == 5
+
+        await store.close()
+
+    async def test_save_rows_unknown_column_raises(self, storage):
+        with pytest.raises(SchemaError, match="not in collection"):
+            await storage.save_rows("todos", ["text", "bogus"], [("a", "b")])
+
+    async def test_save_many_tracks_changes(self, storage_config, todo_schema):
+        config = replace(
+            storage_config,
+            backend_url="https://api.example.com/sync",
+        )
+        store = SQLiteLocalFirstStorage()
+        await store.initialize(config)
+        await store.register_collection(todo_schema)
+
+        existing_id = await store.save("todos", {"text": "Existing", "status": "pending"})
+        await store.save_many("todos", [
+            {"id": existing_id, "status": "active"},
+            {"text": "New", "status": "pending"},
+        ])
+
+        changes = await store.get_pending_changes()
+        assert [c.operation for c in changes] == ["create", "update", "create"]
+
+        await store.close()
+
+
+class TestTransactions:
+    """Tests for explicit transactions."""
+
+    async def test_transaction_commits(self, storage):
+        async with storage.transaction():
+            for i in range(3):
+                await storage.save("todos", {"text": f"Todo {i}", "status": "pending"})
+            await storage.save_many("todos", [{"text": "Todo 3", "status": "pending"}])
+
+        assert await storage.count("todos") == 4
+
+    async def test_transaction_rolls_back_on_error(self, storage):
+        with pytest.raises(RuntimeError):
+            async with storage.transaction():
+                await storage.save("todos", {"text": "Todo", "status": "pending"})
+                raise RuntimeError("boom")
+
+        assert await storage.count("todos") == 0
+
+    async def test_nested_transaction_rolls_back_inner_only(self, storage):
+        async with storage.transaction():
+            await storage.save("todos", {"id": "outer", "text": "Outer", "status": "pending"})
+            with pytest.raises(NotFoundError):
+                await storage.update_many("todos", {"missing": {"status": "active"}})
+            await storage.save("todos", {"id": "after", "text": "After", "status": "pending"})
+
+        assert await storage.get("todos", "outer") is not None
+        assert await storage.get("todos", "after") is not None
+
+    async def test_writes_join_open_transaction(self, storage):
+        statements = []
+        await storage.conn.set_trace_callback(statements.append)
+
+        async with storage.transaction():
+            await storage.save("todos", {"text": "Todo", "status": "pending"})
+            await storage.delete("todos", "missing")
+
+        await storage.conn.set_trace_callback(None)
+        assert not any(sql.startswith(("SAVEPOINT", "RELEASE")) for sql in statements)
+
+    async def test_other_task_waits_for_transaction(self, storage):
+        started = asyncio.Event()
+
+        async def writer():
+            await started.wait()
+            await storage.save("todos", {"id": "other", "text": "Other", "status": "pending"})
+
+        task = asyncio.create_task(writer())
+        with pytest.raises(RuntimeError):
+            async with storage.transaction():
+                started.set()
+                await asyncio.sleep(0.01)
+                await storage.save("todos", {"id": "mine", "text": "Mine", "status": "pending"})
+                raise RuntimeError("boom")
+        await task
+
+        assert await storage.get("todos", "mine") is None
+        assert await storage.get("todos", "other") is not None
+
+    async def test_task_started_inside_transaction_cannot_write(self, storage):
+        async with storage.transaction():
+            await storage.save("todos", {"id": "1", "text": "One", "status": "pending"})
+            results = await asyncio.gather(
+                storage.save("todos", {"id": "2", "text": "Two", "status": "pending"}),
+                storage.update("todos", "missing", {"status": "active"}),
+                return_exceptions=True,
+            )
+
+        assert all(isinstance(result, StorageError) for result in results)
+        assert await storage.get("todos", "1") is not None
+
+    async def test_planner_statistics_refreshed_after_writes(self, storage_config, todo_schema):
+        store = SQLiteLocalFirstStorage()
+        await store.initialize(replace(storage_config, analyze_every=2))
+        await store.register_collection(todo_schema)
+        statements = []
+        await store.conn.set_trace_callback(statements.append)
+
+        # The second write falls inside a transaction; the refresh waits for it
+        await store.save("todos", {"text": "A"})
+        async with store.transaction():
+            await store.save("todos", {"text": "B"})
+        await store._optimize_task
+
+        assert statements.count("PRAGMA optimize") == 1
+        await store.close()
+        assert statements.count("PRAGMA optimize") == 2
+
+    async def test_concurrent_writes_share_a_commit(self, storage):
+        statements = []
+        await storage.conn.set_trace_callback(statements.append)
+
+        results = await asyncio.gather(
+            *(storage.save("todos", {"id": str(i), "text": "Todo"}) for i in range(10)),
+            storage.update("todos", "missing", {"status": "active"}),
+            return_exceptions=True,
+        )
+
+        await storage.conn.set_trace_callback(None)
+        assert results[:10] == [str(i) for i in range(10)]
+        assert isinstance(results[10], NotFoundError)
+        assert statements.count("COMMIT") == 1
+        assert await storage.count("todos", exact=True) == 10
+
+
+class TestReaderPool:
+    """Tests for the read-only connection pool."""
 
-    async def test_json_field(self, storage):
+    @pytest.fixture
+    def storage_config(self, storage_config_ondisk):
+        # Readers need WAL, which in-memory databases cannot use
+        return storage_config_ondisk
+
+    @pytest_asyncio.fixture(loop_scope="module")
+    async def storage(self, storage_config, todo_schema):
+        store = SQLiteLocalFirstStorage()
+        await store.initialize(storage_config)
+        await store.register_collection(todo_schema)
+        yield store
+        await store.close()
+
+    async def test_reads_see_only_committed_writes(self, storage):
+        other_reads = []
+
+        async def reader():
+            other_reads.append(await storage.get("todos", "1"))
+
+        async with storage.transaction():
+            await storage.save("todos", {"id": "1", "text": "Todo", "status": "pending"})
+            assert await storage.get("todos", "1") is not None  # Own write
+            await asyncio.create_task(reader())
+
+        assert other_reads == [None]
+        assert await storage.get("todos", "1") is not None
+
+    async def test_nested_reads_do_not_wait_for_a_reader(self, storage_config, todo_schema):
+        config = replace(storage_config, reader_pool_size=1)
+        store = SQLiteLocalFirstStorage()
+        await store.initialize(config)
+        await store.register_collection(todo_schema)
+        await store.save_many("todos", [{"id": str(i), "text": "Todo"} for i in range(3)])
+
+        seen = [
+            await store.get("todos", entity["id"]) async for entity in store.query_iter("todos")
+        ]
+
+        assert len(seen) == 3
+        await store.close()
+
+    async def test_no_readers_outside_wal(self, storage_config, todo_schema):
+        config = replace(storage_config, journal_mode="DELETE")
+        store = SQLiteLocalFirstStorage()
+        await store.initialize(config)
+        await store.register_collection(todo_schema)
+
+        await store.save("todos", {"id": "1", "text": "Todo", "status": "pending"})
+        assert await store.get("todos", "1") is not None
+        assert store._readers == []
+
+        await store.close()
+
+    async def test_reads_outside_wal_wait_for_open_transaction(self, storage_config, todo_schema):
+        config = replace(storage_config, journal_mode="DELETE")
+        store = SQLiteLocalFirstStorage()
+        await store.initialize(config)
+        await store.register_collection(todo_schema)
+        saved = asyncio.Event()
+
+        async def read_after_save():
+            await saved.wait()
+            return await store.get("todos", "1")
+
+        # Started before the transaction, so an unrelated task
+        other = asyncio.create_task(read_after_save())
+        with pytest.raises(ValueError):
+            async with store.transaction():
+                await store.save("todos", {"id": "1", "text": "Todo", "status": "pending"})
+                saved.set()
+                await asyncio.sleep(0.01)
+                assert not other.done()  # Waiting, not reading the uncommitted row
+                raise ValueError("roll back")
+
+        assert await other is None
+        assert [todo async for todo in store.query_iter("todos")] == []
+
+        await store.close()
+
+    async def test_no_readers_for_memory_database(self):
+        config = StorageConfig(db_path="file:readers?mode=memory&cache=shared", uri=True)
+        store = SQLiteLocalFirstStorage()
+        await store.initialize(config)
+
+        assert store._readers == []
+
+        await store.close()
+
+
+class TestCollectionHandle:
+    """Tests for collection handles."""
+
+    async def test_handle_crud(self, storage):
+        todos = storage.collection("todos")
+
+        entity_id = await todos.save({"text": "Buy groceries", "status": "pending"})
+        assert (await todos.get(entity_id))["text"] == "Buy groceries"
+
+        updated = await todos.update(entity_id, {"status": "active"})
+        assert updated["status"] == "active"
+        assert await todos.count({"status": "active"}) == 1
+        assert len(await todos.query()) == 1
+
+        assert await todos.delete(entity_id) is True
+        assert await todos.get(entity_id) is None
+
+    async def test_handle_unregistered_collection_raises(self, storage):
+        with pytest.raises(SchemaError, match="not registered"):
+            storage.collection("nonexistent")
+
+
+class TestFieldTypes:
+    """Tests for different field types."""
+
+    @pytest.mark.parametrize(("field", "value", "expected"), [
+        ("done", True, True),
+        ("priority", 5, 5),
+        ("tags", ["work", "urgent"], ["work", "urgent"]),
+        ("created_at", NOW, NOW.isoformat()),
+    ])
+    async def test_field_round_trip(self, storage, field, value, expected):
         entity_id = await storage.save("todos", {
             "text": "Test",
             "status": "pending",
-            "tags": ["work", "urgent"],
+            field: value,
         })
 
         entity = await storage.get("todos", entity_id)
-        assert entity["tags"] == ["work", "urgent"]
+        assert entity[field] == expected
+        assert type(entity[field]) is type(expected)
 
-    async def test_datetime_field(self, storage):
-        now = datetime.now(timezone.utc)
-        entity_id = await storage.save("todos", {
-            "text": "Test",
-            "status": "pending",
-            "created_at": now,
-        })
+    async def test_missing_fields_read_back_as_none(self, storage):
+        entity_id = await storage.save("todos", {"text": "Test", "status": "pending"})
 
         entity = await storage.get("todos", entity_id)
-        assert entity["created_at"] == now.isoformat()
+        assert entity["done"] is None
+        assert entity["priority"] is None
+        assert entity["tags"] is None
+        assert entity["_version"] == 1
+
+    async def test_json_field_stored_as_text(self, storage):
+        entity_id = await storage.save("todos", {"text": "Test", "tags": ["work", "urgent"]})
+
+        cursor = await storage.conn.execute(
+            "SELECT typeof(tags) FROM todos WHERE id = ?", (entity_id,)
+        )
+        assert (await cursor.fetchone())[0] == "text"
+        assert len(await storage.query("todos", filter={"tags__contains": "urgent"})) == 1
+
+    async def test_json_field_stored_as_msgpack(self, storage_config, todo_schema):
+        pytest.importorskip("msgpack")
+        store = SQLiteLocalFirstStorage()
+        await store.initialize(replace(storage_config, json_encoding="msgpack"))
+        await store.register_collection(todo_schema)
+
+        entity_id = await store.save("todos", {"text": "Test", "tags": {"a": [1, 2]}})
+
+        cursor = await store.conn.execute(
+            "SELECT typeof(tags) FROM todos WHERE id = ?", (entity_id,)
+        )
+        assert (await cursor.fetchone())[0] == "blob"
+        assert (await store.get("todos", entity_id))["tags"] == {"a": [1, 2]}
+
+        await store.close()
+
+    async def test_json_encoding_fixed_per_database(self, storage_config_ondisk, todo_schema):
+        store = SQLiteLocalFirstStorage()
+        await store.initialize(storage_config_ondisk)
+        await store.register_collection(todo_schema)
+        await store.close()
+
+        reopened = SQLiteLocalFirstStorage()
+        with pytest.raises(StorageError, match="json_encoding='json'"):
+            await reopened.initialize(replace(storage_config_ondisk, json_encoding="msgpack"))
+        await reopened.close()
+
 
 
 class TestQueryOperations:
     """Tests for query functionality."""
 
     async def test_query_all(self, storage):
-        await storage.save("todos", {"text": "Todo 1", "status": "pending"})
-        await storage.save("todos", {"text": "Todo 2", "status": "pending"})
+        await storage.save_many("todos", [
+            {"text": "Todo 1", "status": "pending"},
+            {"text": "Todo 2", "status": "pending"},
+        ])
 
         results = await storage.query("todos")
 
         assert len(results) == 2
 
     async def test_query_with_equality_filter(self, storage):
-        await storage.save("todos", {"text": "Todo 1", "status": "pending"})
-        await storage.save("todos", {"text": "Todo 2", "status": "active"})
+        await storage.save_many("todos", [
+            {"text": "Todo 1", "status": "pending"},
+            {"text": "Todo 2", "status": "active"},
+        ])
 
         results = await storage.query("todos", filter={"status": "pending"})
 
         assert len(results) == 1
         assert results[0]["status"] == "pending"
 
+    async def test_queries_of_the_same_shape_share_sql(self, storage):
+        await storage.query("todos", filter={"status": "pending"}, sort=[("text", "asc")])
+        hits = _select_sql.cache_info().hits
+
+        await storage.query("todos", filter={"status": "active"}, sort=[("text", "asc")])
+
+        assert _select_sql.cache_info().hits == hits + 1
+
     async def test_query_with_comparison_filter(self, storage):
-        await storage.save("todos", {"text": "Low", "status": "pending", "priority": 1})
-        await storage.save("todos", {"text": "High", "status": "pending", "priority": 5})
+        await storage.save_many("todos", [
+            {"text": "Low", "status": "pending", "priority": 1},
+            {"text": "High", "status": "pending", "priority": 5},
+        ])
 
         results = await storage.query("todos", filter={"priority__gte": 3})
 
@@ -313,36 +1141,98 @@ class TestQueryOperations:
         assert results[0]["text"] == "High"
 
     async def test_query_with_in_filter(self, storage):
-        await storage.save("todos", {"text": "Todo 1", "status": "pending"})
-        await storage.save("todos", {"text": "Todo 2", "status": "active"})
-        await storage.save("todos", {"text": "Todo 3", "status": "completed"})
+        await storage.save_many("todos", [
+            {"text": "Todo 1", "status": "pending"},
+            {"text": "Todo 2", "status": "active"},
+            {"text": "Todo 3", "status": "completed"},
+        ])
 
         results = await storage.query("todos", filter={"status__in": ["pending", "active"]})
 
         assert len(results) == 2
 
     async def test_query_with_contains_filter(self, storage):
-        await storage.save("todos", {"text": "Buy groceries", "status": "pending"})
-        await storage.save("todos", {"text": "Call mom", "status": "pending"})
+        await storage.save_many("todos", [
+            {"text": "Buy groceries", "status": "pending"},
+            {"text": "Call mom", "status": "pending"},
+        ])
 
         results = await storage.query("todos", filter={"text__contains": "groceries"})
 
         assert len(results) == 1
         assert "groceries" in results[0]["text"]
 
+    async def test_query_with_string_and_negated_filters(self, storage):
+        await storage.save_many("todos", [
+            {"text": "Buy milk", "status": "pending"},
+            {"text": "Sell car", "status": "active"},
+            {"text": "Buy car", "status": "completed"},
+        ])
+
+        starts = await storage.query("todos", filter={"text__starts_with": "Buy"})
+        ends = await storage.query("todos", filter={"text__ends_with": "car"})
+        not_in = await storage.query("todos", filter={"status__not_in": ["pending", "active"]})
+        ne = await storage.query("todos", filter={"status__ne": "pending"})
+
+        assert len(starts) == 2
+        assert len(ends) == 2
+        assert [e["text"] for e in not_in] == ["Buy car"]
+        assert len(ne) == 2
+
     async def test_query_with_null_filter(self, storage):
-        await storage.save("todos", {"text": "Has priority", "status": "pending", "priority": 5})
-        await storage.save("todos", {"text": "No priority", "status": "pending"})
+        await storage.save_many("todos", [
+            {"text": "Has priority", "status": "pending", "priority": 5},
+            {"text": "No priority", "status": "pending"},
+        ])
 
         results = await storage.query("todos", filter={"priority__is_null": True})
 
         assert len(results) == 1
         assert results[0]["text"] == "No priority"
 
+    async def test_query_with_empty_in_filter(self, storage):
+        await storage.save_many("todos", [
+            {"text": "Todo 1", "status": "pending"},
+            {"text": "Todo 2", "status": "active"},
+        ])
+        statements = []
+        await storage.conn.set_trace_callback(statements.append)
+        try:
+            results = await storage.query("todos", filter={"status__in": []})
+            count = await storage.count("todos", filter={"status__in": []})
+        finally:
+            await storage.conn.set_trace_callback(None)
+
+        assert results == []
+        assert count == 0
+        assert statements == []  # Answered without querying
+        assert len(await storage.query("todos", filter={"status__not_in": []})) == 2
+
+    async def test_query_rejects_unknown_fields(self, storage):
+        with pytest.raises(SchemaError, match="unknown field"):
+            await storage.query("todos", filter={"status = status OR 1 = 1 --": "x"})
+        with pytest.raises(SchemaError, match="unknown field"):
+            await storage.query("todos", filter={"bogus__gte": 1})
+        with pytest.raises(SchemaError, match="Unknown filter operator"):
+            await storage.query("todos", filter={"status__bogus": 1})
+        with pytest.raises(SchemaError, match="unknown field"):
+            await storage.query("todos", sort=[("(SELECT 1)", "asc")])
+
+    async def test_query_filters_on_metadata(self, storage):
+        async with storage.transaction():
+            await storage.save("todos", {"id": "1", "text": "Todo", "status": "pending"})
+            await storage.save("todos", {"id": "1", "status": "active"})
+
+        results = await storage.query("todos", filter={"_version__gte": 2})
+
+        assert [e["id"] for e in results] == ["1"]
+
     async def test_query_with_sort(self, storage):
-        await storage.save("todos", {"text": "B", "status": "pending", "priority": 2})
-        await storage.save("todos", {"text": "A", "status": "pending", "priority": 1})
-        await storage.save("todos", {"text": "C", "status": "pending", "priority": 3})
+        await storage.save_many("todos", [
+            {"text": "B", "status": "pending", "priority": 2},
+            {"text": "A", "status": "pending", "priority": 1},
+            {"text": "C", "status": "pending", "priority": 3},
+        ])
 
         results = await storage.query("todos", sort=[("priority", "asc")])
 
@@ -351,8 +1241,10 @@ class TestQueryOperations:
         assert results[2]["priority"] == 3
 
     async def test_query_with_sort_desc(self, storage):
-        await storage.save("todos", {"text": "B", "status": "pending", "priority": 2})
-        await storage.save("todos", {"text": "A", "status": "pending", "priority": 1})
+        await storage.save_many("todos", [
+            {"text": "B", "status": "pending", "priority": 2},
+            {"text": "A", "status": "pending", "priority": 1},
+        ])
 
         results = await storage.query("todos", sort=[("priority", "desc")])
 
@@ -360,33 +1252,64 @@ class TestQueryOperations:
         assert results[1]["priority"] == 1
 
     async def test_query_with_limit(self, storage):
-        for i in range(5):
-            await storage.save("todos", {"text": f"Todo {i}", "status": "pending"})
+        await storage.save_many("todos", [
+            {"text": f"Todo {i}", "status": "pending"} for i in range(5)
+        ])
 
         results = await storage.query("todos", limit=2)
 
         assert len(results) == 2
 
     async def test_query_with_offset(self, storage):
-        for i in range(5):
-            await storage.save("todos", {"text": f"Todo {i}", "status": "pending", "priority": i})
+        await storage.save_many("todos", [
+            {"text": f"Todo {i}", "status": "pending", "priority": i} for i in range(5)
+        ])
 
         results = await storage.query("todos", sort=[("priority", "asc")], offset=2, limit=2)
 
         assert len(results) == 2
         assert results[0]["priority"] == 2
 
+    async def test_query_iter(self, storage):
+        await storage.save_many("todos", [
+            {"text": f"Todo {i}", "status": "pending", "priority": i} for i in range(5)
+        ])
+
+        texts = [
+            entity["text"]
+            async for entity in storage.query_iter(
+                "todos", filter={"priority__gte": 1}, sort=[("priority", "desc")]
+            )
+        ]
+
+        assert texts == ["Todo 4", "Todo 3", "Todo 2", "Todo 1"]
+
     async def test_count_all(self, storage):
-        await storage.save("todos", {"text": "Todo 1", "status": "pending"})
-        await storage.save("todos", {"text": "Todo 2", "status": "active"})
+        await storage.save_many("todos", [
+            {"text": "Todo 1", "status": "pending"},
+            {"text": "Todo 2", "status": "active"},
+        ])
 
         count = await storage.count("todos")
 
         assert count == 2
 
+    async def test_count_tracks_writes(self, storage):
+        ids = await storage.save_many("todos", [
+            {"text": f"Todo {i}", "status": "pending"} for i in range(4)
+        ])
+        await storage.delete("todos", ids[0])
+        await storage.delete_many("todos", [ids[1]])
+        await storage.save_many("todos", [{"id": ids[0], "text": "Revived"}])
+
+        assert await storage.count("todos") == 3
+        assert await storage.count("todos", exact=True) == 3
+
     async def test_count_with_filter(self, storage):
-        await storage.save("todos", {"text": "Todo 1", "status": "pending"})
-        await storage.save("todos", {"text": "Todo 2", "status": "active"})
+        await storage.save_many("todos", [
+            {"text": "Todo 1", "status": "pending"},
+            {"text": "Todo 2", "status": "active"},
+        ])
 
         count = await storage.count("todos", filter={"status": "pending"})
 
@@ -409,6 +1332,30 @@ class TestVectorSearch:
         with pytest.raises(NotSupportedError, match="not enabled"):
             await storage.semantic_search("todos", "test query")
 
+    async def test_enabled_without_sqlite_vec(self, storage_config, todo_schema):
+        try:
+            import sqlite_vec  # noqa: F401
+        except ImportError:
+            pass
+        else:
+            pytest.skip("sqlite-vec is installed")
+
+        storage_config.enable_vectors = True
+        store = SQLiteLocalFirstStorage()
+        await store.initialize(storage_config)
+        try:
+            await store.register_collection(
+                Schema(name="notes", fields={"id": FieldType.STRING, "body": FieldType.STRING},
+                       vector_field="body")
+            )
+            await store.save("notes", {"body": "still works locally"})
+
+            assert store.has_vector_search is False
+            with pytest.raises(NotSupportedError, match="sqlite-vec"):
+                await store.semantic_search("notes", "test query")
+        finally:
+            await store.close()
+
 
 class TestSyncOperations:
     """Tests for sync functionality."""
@@ -423,8 +1370,8 @@ class TestSyncOperations:
         await store.close()
 
     async def test_supports_sync_with_backend(self, storage_config, todo_schema):
-        config = StorageConfig(
-            db_path=storage_config.db_path,
+        config = replace(
+            storage_config,
             backend_url="https://api.example.com/sync",
         )
         store = SQLiteLocalFirstStorage()
@@ -443,6 +1390,162 @@ class TestSyncOperations:
         with pytest.raises(NotSupportedError, match="not available"):
             await storage.get_pending_changes()
 
+    async def test_pending_change_data_with_datetime(self, storage_config, todo_schema):
+        config = replace(
+            storage_config,
+            backend_url="https://api.example.com/sync",
+        )
+        store = SQLiteLocalFirstStorage()
+        await store.initialize(config)
+        await store.register_collection(todo_schema)
+
+        now = datetime.now(timezone.utc)
+        await store.save("todos", {"text": "Todo", "status": "pending", "created_at": now})
+
+        (change,) = await store.get_pending_changes()
+        assert change.data["created_at"] == now.isoformat()
+
+        await store.close()
+
+    async def test_get_pending_changes_pages(self, storage_config, todo_schema):
+        config = replace(
+            storage_config,
+            backend_url="https://api.example.com/sync",
+        )
+        store = SQLiteLocalFirstStorage()
+        await store.initialize(config)
+        await store.register_collection(todo_schema)
+
+        # One batch shares a single timestamp, so pages must not key on it alone
+        await store.save_many(
+            "todos", [{"id": str(i), "text": "Todo", "status": "pending"} for i in range(5)]
+        )
+
+        pages = []
+        page = await store.get_pending_changes(limit=2)
+        while page:
+            pages.append([c.entity_id for c in page])
+            page = await store.get_pending_changes(after=page[-1], limit=2)
+
+        assert pages == [["0", "1"], ["2", "3"], ["4"]]
+
+        await store.close()
+
+    async def test_get_pending_changes_after_late_commit(self, storage_config, todo_schema):
+        config = replace(
+            storage_config,
+            backend_url="https://api.example.com/sync",
+        )
+        store = SQLiteLocalFirstStorage()
+        await store.initialize(config)
+        await store.register_collection(todo_schema)
+        await store.save("todos", {"id": "1", "text": "Todo", "status": "pending"})
+        (last,) = await store.get_pending_changes()
+
+        # A write that took its timestamp before the page was read but
+        # committed after it
+        await store.conn.execute(
+            "INSERT INTO _pending_changes (collection, entity_id, operation, data, timestamp) "
+            "VALUES ('todos', '2', 'create', '{}', 0)"
+        )
+        await store.conn.commit()
+
+        changes = await store.get_pending_changes(after=last)
+        assert [c.entity_id for c in changes] == ["2"]
+
+        await store.close()
+
+    async def test_iter_and_ack_pending_changes(self, storage_config, todo_schema):
+        config = replace(
+            storage_config,
+            backend_url="https://api.example.com/sync",
+        )
+        store = SQLiteLocalFirstStorage()
+        await store.initialize(config)
+        try:
+            await store.register_collection(todo_schema)
+            await store.save_many(
+                "todos", [{"id": str(i), "text": "Todo", "status": "pending"} for i in range(5)]
+            )
+
+            changes = [change async for change in store.iter_pending_changes(chunk_size=2)]
+            assert [c.entity_id for c in changes] == ["0", "1", "2", "3", "4"]
+
+            await store.ack_changes(c.id for c in changes[:3])
+
+            remaining = await store.get_pending_changes()
+            assert [c.entity_id for c in remaining] == ["3", "4"]
+        finally:
+            await store.close()
+
+    async def test_text_change_timestamps_are_migrated(self, storage_config_ondisk):
+        import sqlite3
+
+        legacy = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+        db = sqlite3.connect(storage_config_ondisk.db_path)
+        db.executescript("""
+            CREATE TABLE _pending_changes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                collection TEXT NOT NULL,
+                entity_id TEXT NOT NULL,
+                operation TEXT NOT NULL,
+                data TEXT,
+                timestamp TEXT NOT NULL
+            );
+        """)
+        db.execute(
+            "INSERT INTO _pending_changes (collection, entity_id, operation, data, timestamp) "
+            "VALUES ('todos', '1', 'delete', '{}', ?)",
+            (legacy.isoformat(),),
+        )
+        db.commit()
+        db.close()
+
+        config = replace(
+            storage_config_ondisk,
+            backend_url="https://api.example.com/sync",
+        )
+        store = SQLiteLocalFirstStorage()
+        await store.initialize(config)
+
+        (change,) = await store.get_pending_changes()
+        assert change.timestamp == legacy
+        assert change.timestamp.tzinfo is not None
+
+        await store.close()
+
+
+class TestApplyChanges:
+    """Tests for applying remote changes locally."""
+
+    async def test_apply_changes(self, storage_config, todo_schema):
+        config = replace(
+            storage_config,
+            backend_url="https://api.example.com/sync",
+        )
+        store = SQLiteLocalFirstStorage()
+        await store.initialize(config)
+        await store.register_collection(todo_schema)
+
+        now = datetime.now(timezone.utc)
+        await store.apply_changes([
+            Change("todos", "a", "create", {"text": "A", "status": "pending"}, now),
+            Change("todos", "b", "create", {"text": "B", "status": "pending"}, now),
+            Change("todos", "a", "update", {"status": "active"}, now),
+            Change("todos", "b", "delete", {}, now),
+            Change("todos", "b", "create", {"text": "B again", "status": "pending"}, now),
+        ])
+
+        a = await store.get("todos", "a")
+        assert a["text"] == "A"
+        assert a["status"] == "active"
+        assert (await store.get("todos", "b"))["text"] == "B again"
+
+        # Remote changes are not queued to be pushed back
+        assert await store.get_pending_changes() == []
+
+        await store.close()
+
 
 class TestMultipleCollections:
     """Tests for handling multiple collections."""
@@ -464,9 +1567,10 @@ class TestMultipleCollections:
             )
         )
 
-        # Each collection is independent
-        await store.save("todos", {"text": "Todo 1"})
-        await store.save("notes", {"content": "Note 1"})
+        # Each collection is independent; one transaction spans both
+        async with store.transaction():
+            await store.save("todos", {"text": "Todo 1"})
+            await store.save("notes", {"content": "Note 1"})
 
         assert await store.count("todos") == 1
         assert await store.count("notes") == 1
@@ -490,8 +1594,9 @@ class TestMultipleCollections:
             )
         )
 
-        todo_id = await store.save("todos", {"id": "shared-id", "text": "Todo"})
-        note_id = await store.save("notes", {"id": "shared-id", "text": "Note"})
+        async with store.transaction():
+            await store.save("todos", {"id": "shared-id", "text": "Todo"})
+            await store.save("notes", {"id": "shared-id", "text": "Note"})
 
         # Same ID in different collections
         todo = await store.get("todos", "shared-id")
@@ -501,3 +1606,41 @@ class TestMultipleCollections:
         assert note["text"] == "Note"
 
         await store.close()
+
+
+class TestMount:
+    """Tests for the Amplifier module entry point."""
+
+    async def test_mount_registers_schemas(self, storage_config):
+        from amplifier_module_storage_localfirst import mount
+
+        class Coordinator:
+            def __init__(self):
+                self.mounted = {}
+
+            async def mount(self, slot, obj):
+                self.mounted[slot] = obj
+
+        coordinator = Coordinator()
+        await mount(coordinator, {
+            "db_path": storage_config.db_path,
+            "uri": storage_config.uri,
+            "schemas": [
+                {
+                    "name": "todos",
+                    "fields": {"id": "string", "text": "string", "done": FieldType.BOOLEAN},
+                    "indexes": ["done"],
+                },
+                {"name": "notes", "fields": {"id": "string", "content": "string"}},
+            ],
+        })
+
+        store = coordinator.mounted["storage"]
+        await store.save("todos", {"text": "Todo 1", "done": True})
+        await store.save("notes", {"content": "Note 1"})
+
+        todos = await store.query("todos")
+        assert todos[0]["done"] is True
+        assert await store.count("notes") == 1
+
+        await store.close()